@@ -41,6 +41,7 @@ class AddressAdmin(admin.ModelAdmin):
 
     list_display = ('user', 'address_type', 'first_name',
                     'last_name', 'city', 'state', 'is_default')
+    list_select_related = ('user',)
     list_filter = ('address_type', 'is_default', 'country', 'state')
     search_fields = ('user__email', 'first_name', 'last_name', 'city', 'state')
     ordering = ('user', '-is_default', '-created_at')
@@ -58,12 +59,17 @@ class AddressAdmin(admin.ModelAdmin):
 
     readonly_fields = ('created_at', 'updated_at')
 
+    def get_queryset(self, request):
+        """Optimize queryset with related fields."""
+        return super().get_queryset(request).select_related('user')
+
 
 @admin.register(EmailVerification)
 class EmailVerificationAdmin(admin.ModelAdmin):
     """Email verification admin."""
 
     list_display = ('user', 'token', 'is_used', 'created_at', 'expires_at')
+    list_select_related = ('user',)
     list_filter = ('is_used', 'created_at', 'expires_at')
     search_fields = ('user__email', 'token')
     ordering = ('-created_at',)
@@ -76,12 +82,17 @@ class EmailVerificationAdmin(admin.ModelAdmin):
 
     readonly_fields = ('created_at', 'expires_at')
 
+    def get_queryset(self, request):
+        """Optimize queryset with related fields."""
+        return super().get_queryset(request).select_related('user')
+
 
 @admin.register(PasswordReset)
 class PasswordResetAdmin(admin.ModelAdmin):
     """Password reset admin."""
 
     list_display = ('user', 'token', 'is_used', 'created_at', 'expires_at')
+    list_select_related = ('user',)
     list_filter = ('is_used', 'created_at', 'expires_at')
     search_fields = ('user__email', 'token')
     ordering = ('-created_at',)
@@ -93,3 +104,7 @@ class PasswordResetAdmin(admin.ModelAdmin):
     )
 
     readonly_fields = ('created_at', 'expires_at')
+
+    def get_queryset(self, request):
+        """Optimize queryset with related fields."""
+        return super().get_queryset(request).select_related('user')
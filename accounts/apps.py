@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        # Build simplejwt's shared token backend at startup so the first
+        # login/refresh request does not pay for key and algorithm setup.
+        from rest_framework_simplejwt.state import token_backend  # noqa: F401
+        from . import signals  # noqa: F401
@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+USER_CACHE_TIMEOUT = 300  # 5 minutes
+
+
+def user_cache_key(user_id):
+    """Cache key for the user object behind a user's access tokens."""
+    return f"accounts:auth:user:{user_id}"
+
+
+def invalidate_cached_user(user_id):
+    """Drop a user's cached auth object after their row changes."""
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that serves the token's user from the cache instead of
+    fetching the row on every request. Token signatures are still verified
+    locally; cached users are invalidated whenever the user row is saved.
+
+    The result is remembered on the underlying HttpRequest, so the
+    middleware's check and DRF's authentication share a single pass.
+    """
+
+    def authenticate(self, request):
+        """Authenticate the request once, reusing an earlier result."""
+        http_request = getattr(request, '_request', request)
+        authenticated = getattr(http_request, '_jwt_authenticated', None)
+        if authenticated is None:
+            authenticated = super().authenticate(request)
+            http_request._jwt_authenticated = authenticated
+        return authenticated
+
+    def get_user(self, validated_token):
+        """Return the token's user, from the cache when possible."""
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(validated_token)
+            cache.set(key, user, USER_CACHE_TIMEOUT)
+            return user
+
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(
+                api_settings.REVOKE_TOKEN_CLAIM
+            ) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+
+        return user
+
+
+# Stateless, so one instance can serve every request outside DRF
+jwt_authentication = CachedJWTAuthentication()
@@ -0,0 +1,41 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from accounts.models import EmailVerification, PasswordReset
+
+
+class Command(BaseCommand):
+    help = 'Delete expired email verification and password reset tokens'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=7,
+            help='Keep tokens that expired within this many days (default: 7)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows deleted per query (default: 5000)',
+        )
+
+    def handle(self, *args, **options):
+        """Delete stale tokens in bounded batches."""
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        batch_size = options['batch_size']
+
+        for model in (EmailVerification, PasswordReset):
+            stale = model.objects.filter(expires_at__lt=cutoff)
+            total = 0
+            while True:
+                ids = list(stale.values_list('id', flat=True)[:batch_size])
+                if not ids:
+                    break
+                deleted, _ = model.objects.filter(id__in=ids).delete()
+                total += deleted
+
+            self.stdout.write(self.style.SUCCESS(
+                f"Deleted {total} expired {model._meta.verbose_name_plural.lower()}"
+            ))
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-15 22:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emailverification',
+            index=models.Index(fields=['user', 'is_used', 'expires_at'], name='accounts_em_user_id_fcb2a3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='passwordreset',
+            index=models.Index(fields=['user', 'is_used', 'expires_at'], name='accounts_pa_user_id_07a629_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-15 22:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_address_one_default_address_per_user'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='emailverification',
+            index=models.Index(fields=['expires_at'], name='accounts_em_expires_858ceb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='passwordreset',
+            index=models.Index(fields=['expires_at'], name='accounts_pa_expires_b21c08_idx'),
+        ),
+    ]
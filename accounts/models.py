@@ -1,6 +1,19 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from django.core.validators import RegexValidator
+from django.utils import timezone
+from datetime import timedelta
+from .tokens import make_token
+
+
+def _bulk_issue_tokens(model, users, ttl):
+    """Create one token row per user with a single multi-row INSERT."""
+    expires_at = timezone.now() + ttl
+    objs = [
+        model(user=user, token=make_token(user.pk), expires_at=expires_at)
+        for user in users
+    ]
+    return model.objects.bulk_create(objs, batch_size=1000)
 
 
 class User(AbstractUser):
@@ -18,6 +31,7 @@ class User(AbstractUser):
     email_verified = models.BooleanField(default=False)
     phone_verified = models.BooleanField(default=False)
     date_of_birth = models.DateField(blank=True, null=True)
+    last_logout = models.DateTimeField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -67,6 +81,13 @@ class Address(models.Model):
         verbose_name = 'Address'
         verbose_name_plural = 'Addresses'
         ordering = ['-is_default', '-created_at']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=models.Q(is_default=True),
+                name='one_default_address_per_user',
+            ),
+        ]
 
 
 class EmailVerification(models.Model):
@@ -81,9 +102,18 @@ class EmailVerification(models.Model):
     def __str__(self):
         return f"Email verification for {self.user.email}"
 
+    @classmethod
+    def bulk_issue(cls, users, ttl=timedelta(hours=24)):
+        """Issue verification tokens for the given users."""
+        return _bulk_issue_tokens(cls, users, ttl)
+
     class Meta:
         verbose_name = 'Email Verification'
         verbose_name_plural = 'Email Verifications'
+        indexes = [
+            models.Index(fields=['user', 'is_used', 'expires_at']),
+            models.Index(fields=['expires_at']),
+        ]
 
 
 class PasswordReset(models.Model):
@@ -98,6 +128,15 @@ class PasswordReset(models.Model):
     def __str__(self):
         return f"Password reset for {self.user.email}"
 
+    @classmethod
+    def bulk_issue(cls, users, ttl=timedelta(hours=1)):
+        """Issue password reset tokens for the given users."""
+        return _bulk_issue_tokens(cls, users, ttl)
+
     class Meta:
         verbose_name = 'Password Reset'
         verbose_name_plural = 'Password Resets'
+        indexes = [
+            models.Index(fields=['user', 'is_used', 'expires_at']),
+            models.Index(fields=['expires_at']),
+        ]
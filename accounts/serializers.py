@@ -1,10 +1,14 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from django.db import transaction
+from django.utils import timezone
 from django.contrib.auth.password_validation import validate_password
+from gundam_ccs.serializers import CachedFieldsMixin
 from .models import User, Address, EmailVerification, PasswordReset
+from .tokens import check_token
 
 
-class UserRegistrationSerializer(serializers.ModelSerializer):
+class UserRegistrationSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for user registration."""
 
     password = serializers.CharField(
@@ -52,7 +56,7 @@ class UserLoginSerializer(serializers.Serializer):
         return attrs
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for user profile."""
 
     class Meta:
@@ -63,15 +67,6 @@ class UserProfileSerializer(serializers.ModelSerializer):
                             'phone_verified', 'date_joined', 'last_login')
 
 
-class UserProfileUpdateSerializer(serializers.ModelSerializer):
-    """Serializer for updating user profile."""
-
-    class Meta:
-        model = User
-        fields = ('username', 'first_name', 'last_name',
-                  'phone', 'avatar', 'date_of_birth')
-
-
 class PasswordChangeSerializer(serializers.Serializer):
     """Serializer for password change."""
 
@@ -94,7 +89,10 @@ class PasswordResetRequestSerializer(serializers.Serializer):
 
     def validate_email(self, value):
         """Validate email exists."""
-        if not User.objects.filter(email=value).exists():
+        try:
+            self.context['user'] = User.objects.only(
+                'id', 'email').get(email=value)
+        except User.DoesNotExist:
             raise serializers.ValidationError(
                 'No user found with this email address.')
         return value
@@ -109,10 +107,16 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
     def validate(self, attrs):
         """Validate password reset."""
         # Validate token
+        user_id = check_token(attrs['token'])
+        if user_id is None:
+            raise serializers.ValidationError(
+                'Invalid or expired reset token.')
         try:
             password_reset = PasswordReset.objects.get(
                 token=attrs['token'],
-                is_used=False
+                user_id=user_id,
+                is_used=False,
+                expires_at__gt=timezone.now()
             )
             attrs['password_reset'] = password_reset
         except PasswordReset.DoesNotExist:
@@ -122,7 +126,7 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
         return attrs
 
 
-class AddressSerializer(serializers.ModelSerializer):
+class AddressSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for user addresses."""
 
     class Meta:
@@ -132,14 +136,25 @@ class AddressSerializer(serializers.ModelSerializer):
                   'country', 'phone', 'is_default', 'created_at', 'updated_at')
         read_only_fields = ('id', 'created_at', 'updated_at')
 
-    def validate(self, attrs):
-        """Validate address data."""
-        # Ensure only one default address per user
-        if attrs.get('is_default', False):
-            user = self.context['request'].user
-            Address.objects.filter(
-                user=user, is_default=True).update(is_default=False)
-        return attrs
+    def _clear_default(self, exclude_pk=None):
+        """Unset the user's current default address."""
+        user = self.context['request'].user
+        Address.objects.filter(user=user, is_default=True).exclude(
+            pk=exclude_pk).update(is_default=False)
+
+    def create(self, validated_data):
+        """Create address, keeping a single default per user."""
+        with transaction.atomic():
+            if validated_data.get('is_default', False):
+                self._clear_default()
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        """Update address, keeping a single default per user."""
+        with transaction.atomic():
+            if validated_data.get('is_default', False):
+                self._clear_default(exclude_pk=instance.pk)
+            return super().update(instance, validated_data)
 
 
 class EmailVerificationSerializer(serializers.Serializer):
@@ -149,10 +164,16 @@ class EmailVerificationSerializer(serializers.Serializer):
 
     def validate_token(self, value):
         """Validate verification token."""
+        user_id = check_token(value)
+        if user_id is None:
+            raise serializers.ValidationError(
+                'Invalid or expired verification token.')
         try:
             verification = EmailVerification.objects.get(
                 token=value,
-                is_used=False
+                user_id=user_id,
+                is_used=False,
+                expires_at__gt=timezone.now()
             )
             self.context['verification'] = verification
         except EmailVerification.DoesNotExist:
@@ -161,7 +182,7 @@ class EmailVerificationSerializer(serializers.Serializer):
         return value
 
 
-class UserListSerializer(serializers.ModelSerializer):
+class UserListSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for listing users (admin only)."""
 
     class Meta:
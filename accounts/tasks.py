@@ -0,0 +1,43 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.mail import send_mail
+
+try:
+    from celery import shared_task
+except ImportError:
+    shared_task = None
+
+logger = logging.getLogger(__name__)
+
+# Fallback worker pool used when Celery is not installed
+_email_executor = ThreadPoolExecutor(max_workers=4)
+
+
+def send_account_email(subject, message, recipient):
+    """Send a single account email synchronously."""
+    try:
+        send_mail(
+            subject,
+            message,
+            settings.DEFAULT_FROM_EMAIL,
+            [recipient],
+            fail_silently=False,
+        )
+    except Exception as e:
+        logger.error(f"Failed to send email to {recipient}: {str(e)}")
+        raise
+
+
+if shared_task is not None:
+    send_account_email_task = shared_task(send_account_email)
+else:
+    send_account_email_task = None
+
+
+def queue_account_email(subject, message, recipient):
+    """Send an account email off the request thread."""
+    if send_account_email_task is not None:
+        send_account_email_task.delay(subject, message, recipient)
+    else:
+        _email_executor.submit(send_account_email, subject, message, recipient)
@@ -1,3 +1,103 @@
-from django.test import TestCase
+import base64
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import jwt
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .models import User
+from .tokens import make_token, check_token
+
+# The project falls back to a database cache whose table tests don't create
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def flip_byte(token, index):
+    """Return the token with one byte of its decoded form altered."""
+    raw = bytearray(base64.urlsafe_b64decode(token.encode()))
+    raw[index] ^= 0x01
+    return base64.urlsafe_b64encode(bytes(raw)).decode()
+
+
+class TokenTest(SimpleTestCase):
+    """Signed email verification and password reset tokens."""
+
+    def test_round_trip(self):
+        self.assertEqual(check_token(make_token(42)), 42)
+
+    def test_tokens_are_unique(self):
+        self.assertNotEqual(make_token(42), make_token(42))
+
+    def test_forged_user_id(self):
+        # Byte 7 is the low byte of the user id
+        self.assertIsNone(check_token(flip_byte(make_token(42), 7)))
+
+    def test_forged_signature(self):
+        self.assertIsNone(check_token(flip_byte(make_token(42), -1)))
+
+    def test_other_secret(self):
+        token = make_token(42)
+        with override_settings(SECRET_KEY='another-secret'):
+            self.assertIsNone(check_token(token))
+
+    def test_malformed(self):
+        for token in ('', 'not-a-token', base64.urlsafe_b64encode(b'x' * 10).decode()):
+            with self.subTest(token=token):
+                self.assertIsNone(check_token(token))
+
+    def test_expired(self):
+        token = make_token(42)
+        later = time.time() + 3601
+        with mock.patch('accounts.tokens.time.time', return_value=later):
+            self.assertIsNone(check_token(token, max_age=timedelta(hours=1)))
+            self.assertEqual(check_token(token, max_age=timedelta(hours=2)), 42)
+            self.assertEqual(check_token(token), 42)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class JWTAuthenticationMiddlewareTest(TestCase):
+    """Bad bearer tokens are rejected with a 401 before reaching the view."""
+
+    url = '/api/v1/cart/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='pilot@example.com', username='pilot', password='x')
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, url, token):
+        return self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_valid_token(self):
+        response = self.get(self.url, AccessToken.for_user(self.user))
+        self.assertEqual(response.status_code, 200)
+
+    def test_expired_token(self):
+        token = AccessToken.for_user(self.user)
+        token.set_exp(lifetime=-timedelta(seconds=1))
+        response = self.get(self.url, token)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'TOKEN_EXPIRED')
+
+    def test_forged_token(self):
+        payload = AccessToken.for_user(self.user).payload
+        response = self.get(self.url, jwt.encode(payload, 'not-the-key', algorithm='HS256'))
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'TOKEN_EXPIRED')
+
+    def test_skipped_path_ignores_token(self):
+        response = self.get('/api/health/', 'garbage')
+        self.assertEqual(response.status_code, 200)
+
+    def test_no_token(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 401)
+        self.assertNotIn('code', response.json())
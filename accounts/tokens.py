@@ -0,0 +1,45 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import time
+from django.conf import settings
+
+_PAYLOAD_LENGTH = 32  # user id (8) + issued-at (8) + nonce (16)
+_MAC_LENGTH = 16
+
+
+def _sign(payload):
+    """Return the truncated HMAC-SHA256 of a token payload."""
+    return hmac.new(settings.SECRET_KEY.encode(), payload,
+                    hashlib.sha256).digest()[:_MAC_LENGTH]
+
+
+def make_token(user_id):
+    """Build a signed, unique token for the given user id."""
+    payload = (
+        int(user_id).to_bytes(8, 'big')
+        + int(time.time()).to_bytes(8, 'big')
+        + os.urandom(16)
+    )
+    return base64.urlsafe_b64encode(payload + _sign(payload)).decode()
+
+
+def check_token(token, max_age=None):
+    """Return the user id a token was issued for, or None if it is forged or too old."""
+    try:
+        raw = base64.urlsafe_b64decode(token.encode())
+    except (binascii.Error, ValueError):
+        return None
+    if len(raw) != _PAYLOAD_LENGTH + _MAC_LENGTH:
+        return None
+
+    payload, mac = raw[:_PAYLOAD_LENGTH], raw[_PAYLOAD_LENGTH:]
+    if not hmac.compare_digest(mac, _sign(payload)):
+        return None
+
+    issued_at = int.from_bytes(payload[8:16], 'big')
+    if max_age is not None and time.time() - issued_at > max_age.total_seconds():
+        return None
+    return int.from_bytes(payload[:8], 'big')
@@ -2,22 +2,54 @@ from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.pagination import PageNumberPagination
 from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
 from rest_framework_simplejwt.exceptions import TokenError
 from django.utils import timezone
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
-import secrets
-from datetime import timedelta
+from django.core.cache import cache
 
 from .models import User, Address, EmailVerification, PasswordReset
 from .serializers import (
     UserRegistrationSerializer, UserLoginSerializer, UserProfileSerializer,
-    UserProfileUpdateSerializer, PasswordChangeSerializer, PasswordResetRequestSerializer,
+    PasswordChangeSerializer, PasswordResetRequestSerializer,
     PasswordResetConfirmSerializer, AddressSerializer, EmailVerificationSerializer,
     UserListSerializer
 )
+from .authentication import invalidate_cached_user
+from .tasks import queue_account_email
+from gundam_ccs.renderers import to_plain
+
+
+# Columns emitted by AddressSerializer; keeps address SELECTs narrow.
+ADDRESS_FIELDS = (
+    'id', 'address_type', 'first_name', 'last_name', 'company',
+    'address_line_1', 'address_line_2', 'city', 'state', 'postal_code',
+    'country', 'phone', 'is_default', 'created_at', 'updated_at',
+)
+
+PROFILE_CACHE_TIMEOUT = 300  # 5 minutes
+
+
+class AccountListPagination(PageNumberPagination):
+    """Page-number pagination for the address and user lists."""
+
+    page_size = 50
+
+
+def profile_cache_key(user):
+    """Cache key for a user's profile, versioned by the row's updated_at."""
+    return f"accounts:profile:{user.pk}:{user.updated_at.timestamp()}"
+
+
+def get_tokens_for_user(user):
+    """Encode a refresh/access token pair for the user once."""
+    refresh = RefreshToken.for_user(user)
+    return {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+    }
 
 
 class UserRegistrationView(APIView):
@@ -32,27 +64,20 @@ class UserRegistrationView(APIView):
             user = serializer.save()
 
             # Create email verification token
-            token = secrets.token_urlsafe(32)
-            expires_at = timezone.now() + timedelta(hours=24)
-            EmailVerification.objects.create(
-                user=user,
-                token=token,
-                expires_at=expires_at
-            )
+            verification, = EmailVerification.bulk_issue([user])
+            token = verification.token
 
-            # Send verification email (in production, use Celery for async)
+            # Send verification email (queued off the request thread)
             # self.send_verification_email(user, token)
 
             # Generate JWT tokens
-            refresh = RefreshToken.for_user(user)
+            tokens = get_tokens_for_user(user)
+            profile = UserProfileSerializer(user).data
 
             return Response({
                 'message': 'User registered successfully. Please check your email for verification.',
-                'user': UserProfileSerializer(user).data,
-                'tokens': {
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
-                }
+                'user': profile,
+                'tokens': tokens
             }, status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -64,13 +89,7 @@ class UserRegistrationView(APIView):
         subject = 'Verify your email address'
         message = f'Please click the following link to verify your email: {verification_url}'
 
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
-        )
+        queue_account_email(subject, message, user.email)
 
 
 class UserLoginView(APIView):
@@ -85,15 +104,13 @@ class UserLoginView(APIView):
             user = serializer.validated_data['user']
 
             # Generate JWT tokens
-            refresh = RefreshToken.for_user(user)
+            tokens = get_tokens_for_user(user)
+            profile = UserProfileSerializer(user).data
 
             return Response({
                 'message': 'Login successful.',
-                'user': UserProfileSerializer(user).data,
-                'tokens': {
-                    'refresh': str(refresh),
-                    'access': str(refresh.access_token),
-                }
+                'user': profile,
+                'tokens': tokens
             }, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -127,9 +144,9 @@ class UserLogoutView(APIView):
                 # Access token will expire naturally, no need to blacklist
                 pass
 
-            # Note: User model doesn't have last_logout field
-            # You can add this field to the User model if needed
-            pass
+            User.objects.filter(pk=request.user.id).update(
+                last_logout=timezone.now())
+            invalidate_cached_user(request.user.id)
 
             return Response({
                 'message': 'Logout successful. All tokens have been invalidated.',
@@ -152,20 +169,25 @@ class UserLogoutAllView(APIView):
         """Logout user from all devices."""
         try:
             # Get all outstanding tokens for the user and blacklist them
-            from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
-
-            tokens = OutstandingToken.objects.filter(user_id=request.user.id)
-            for token in tokens:
-                RefreshToken(token.token).blacklist()
+            from rest_framework_simplejwt.token_blacklist.models import (
+                OutstandingToken, BlacklistedToken)
+
+            outstanding = list(OutstandingToken.objects.filter(
+                user_id=request.user.id).only('id'))
+            BlacklistedToken.objects.bulk_create(
+                [BlacklistedToken(token_id=token.id) for token in outstanding],
+                ignore_conflicts=True,
+                batch_size=1000
+            )
 
-            # Note: User model doesn't have last_logout field
-            # You can add this field to the User model if needed
-            pass
+            User.objects.filter(pk=request.user.id).update(
+                last_logout=timezone.now())
+            invalidate_cached_user(request.user.id)
 
             return Response({
                 'message': 'Logged out from all devices successfully.',
                 'logout_time': timezone.now().isoformat(),
-                'devices_logged_out': tokens.count()
+                'devices_logged_out': len(outstanding)
             }, status=status.HTTP_200_OK)
 
         except Exception as e:
@@ -182,18 +204,24 @@ class UserProfileView(APIView):
 
     def get(self, request):
         """Get user profile."""
-        serializer = UserProfileSerializer(request.user)
-        return Response(serializer.data)
+        cache_key = profile_cache_key(request.user)
+        data = cache.get(cache_key)
+        if data is None:
+            data = to_plain(UserProfileSerializer(request.user).data)
+            cache.set(cache_key, data, PROFILE_CACHE_TIMEOUT)
+        return Response(data)
 
     def put(self, request):
         """Update user profile."""
-        serializer = UserProfileUpdateSerializer(
+        # UserProfileSerializer's writable fields match the update
+        # serializer, so one instance handles both input and output.
+        serializer = UserProfileSerializer(
             request.user, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
             return Response({
                 'message': 'Profile updated successfully.',
-                'user': UserProfileSerializer(request.user).data
+                'user': serializer.data
             })
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -226,19 +254,13 @@ class PasswordResetRequestView(APIView):
         """Request password reset."""
         serializer = PasswordResetRequestSerializer(data=request.data)
         if serializer.is_valid():
-            email = serializer.validated_data['email']
-            user = User.objects.get(email=email)
+            user = serializer.context['user']
 
             # Create password reset token
-            token = secrets.token_urlsafe(32)
-            expires_at = timezone.now() + timedelta(hours=1)
-            PasswordReset.objects.create(
-                user=user,
-                token=token,
-                expires_at=expires_at
-            )
+            password_reset, = PasswordReset.bulk_issue([user])
+            token = password_reset.token
 
-            # Send reset email (in production, use Celery for async)
+            # Send reset email (queued off the request thread)
             # self.send_reset_email(user, token)
 
             return Response({
@@ -254,13 +276,7 @@ class PasswordResetRequestView(APIView):
         subject = 'Reset your password'
         message = f'Please click the following link to reset your password: {reset_url}'
 
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
-        )
+        queue_account_email(subject, message, user.email)
 
 
 class PasswordResetConfirmView(APIView):
@@ -281,8 +297,8 @@ class PasswordResetConfirmView(APIView):
             user.save()
 
             # Mark token as used
-            password_reset.is_used = True
-            password_reset.save()
+            PasswordReset.objects.filter(
+                pk=password_reset.pk).update(is_used=True)
 
             return Response({
                 'message': 'Password reset successfully.'
@@ -303,13 +319,13 @@ class EmailVerificationView(APIView):
             verification = serializer.context['verification']
 
             # Mark email as verified
-            user = verification.user
-            user.email_verified = True
-            user.save()
+            User.objects.filter(pk=verification.user_id).update(
+                email_verified=True, updated_at=timezone.now())
+            invalidate_cached_user(verification.user_id)
 
             # Mark token as used
-            verification.is_used = True
-            verification.save()
+            EmailVerification.objects.filter(
+                pk=verification.pk).update(is_used=True)
 
             return Response({
                 'message': 'Email verified successfully.'
@@ -323,10 +339,12 @@ class AddressListView(generics.ListCreateAPIView):
 
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = AddressSerializer
+    pagination_class = AccountListPagination
 
     def get_queryset(self):
         """Get user's addresses."""
-        return Address.objects.filter(user=self.request.user)
+        return Address.objects.filter(user=self.request.user).only(
+            *ADDRESS_FIELDS).order_by('-is_default', '-created_at')
 
     def perform_create(self, serializer):
         """Create address for current user."""
@@ -341,7 +359,8 @@ class AddressDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         """Get user's addresses."""
-        return Address.objects.filter(user=self.request.user)
+        return Address.objects.filter(user=self.request.user).only(
+            *ADDRESS_FIELDS).order_by('-is_default', '-created_at')
 
 
 class UserListView(generics.ListAPIView):
@@ -349,8 +368,19 @@ class UserListView(generics.ListAPIView):
 
     permission_classes = [permissions.IsAdminUser]
     serializer_class = UserListSerializer
+    pagination_class = AccountListPagination
     queryset = User.objects.all()
 
+    def list(self, request, *args, **kwargs):
+        """List users as plain rows, skipping per-row model and serializer setup."""
+        fields = UserListSerializer.Meta.fields
+        queryset = self.filter_queryset(
+            User.objects.values(*fields).order_by('-date_joined'))
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(page)
+        return Response(list(queryset))
+
 
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
@@ -374,15 +404,10 @@ def resend_verification_email(request):
         }, status=status.HTTP_400_BAD_REQUEST)
 
     # Create new verification token
-    token = secrets.token_urlsafe(32)
-    expires_at = timezone.now() + timedelta(hours=24)
-    EmailVerification.objects.create(
-        user=user,
-        token=token,
-        expires_at=expires_at
-    )
-
-    # Send verification email (in production, use Celery for async)
+    verification, = EmailVerification.bulk_issue([user])
+    token = verification.token
+
+    # Send verification email (queued off the request thread)
     # send_verification_email(user, token)
 
     return Response({
@@ -1,6 +1,11 @@
+from decimal import Decimal
 from django.contrib import admin
+from django.db.models import Sum
 from django.utils.html import format_html
-from .models import Cart, CartItem, CartCoupon, AppliedCoupon
+from .models import (
+    Cart, CartItem, CartCoupon, AppliedCoupon, PRICE_FIELD, TAX_MULTIPLIER,
+    current_price_expression, line_total_expression
+)
 
 
 class CartItemInline(admin.TabularInline):
@@ -8,6 +13,7 @@ class CartItemInline(admin.TabularInline):
 
     model = CartItem
     extra = 0
+    raw_id_fields = ('product',)
     fields = ('product', 'quantity', 'total_price', 'is_available')
     readonly_fields = ('total_price', 'is_available')
 
@@ -17,6 +23,7 @@ class AppliedCouponInline(admin.TabularInline):
 
     model = AppliedCoupon
     extra = 0
+    raw_id_fields = ('coupon',)
     fields = ('coupon', 'discount_amount', 'applied_at')
     readonly_fields = ('discount_amount', 'applied_at')
 
@@ -25,8 +32,9 @@ class AppliedCouponInline(admin.TabularInline):
 class CartAdmin(admin.ModelAdmin):
     """Cart admin."""
 
-    list_display = ('user', 'total_items', 'total_price',
-                    'total_price_with_tax', 'created_at')
+    list_display = ('user', 'admin_total_items', 'admin_total_price',
+                    'admin_total_price_with_tax', 'created_at')
+    raw_id_fields = ('user',)
     list_filter = ('created_at',)
     search_fields = ('user__email',)
     ordering = ('-created_at',)
@@ -44,8 +52,30 @@ class CartAdmin(admin.ModelAdmin):
     inlines = [CartItemInline, AppliedCouponInline]
 
     def get_queryset(self, request):
-        """Optimize queryset with related fields."""
-        return super().get_queryset(request).select_related('user')
+        """Optimize queryset with related fields and SQL-side totals."""
+        return super().get_queryset(request).select_related('user').annotate(
+            _total_items=Sum('items__quantity'),
+            _total_price=Sum(line_total_expression('items__'),
+                             output_field=PRICE_FIELD),
+        )
+
+    def admin_total_items(self, obj):
+        """Display total number of items."""
+        return obj._total_items or 0
+    admin_total_items.short_description = 'Total Items'
+    admin_total_items.admin_order_field = '_total_items'
+
+    def admin_total_price(self, obj):
+        """Display total price."""
+        return obj._total_price or Decimal('0')
+    admin_total_price.short_description = 'Total Price'
+    admin_total_price.admin_order_field = '_total_price'
+
+    def admin_total_price_with_tax(self, obj):
+        """Display total price including tax."""
+        return (obj._total_price or Decimal('0')) * TAX_MULTIPLIER
+    admin_total_price_with_tax.short_description = 'Total Price With Tax'
+    admin_total_price_with_tax.admin_order_field = '_total_price'
 
 
 @admin.register(CartItem)
@@ -54,6 +84,8 @@ class CartItemAdmin(admin.ModelAdmin):
 
     list_display = ('cart', 'product', 'quantity', 'unit_price',
                     'total_price', 'is_available', 'added_at')
+    list_select_related = ('cart__user', 'product')
+    raw_id_fields = ('cart', 'product')
     list_filter = ('added_at',)
     search_fields = ('cart__user__email', 'product__name')
     ordering = ('-added_at',)
@@ -72,12 +104,15 @@ class CartItemAdmin(admin.ModelAdmin):
 
     def unit_price(self, obj):
         """Display unit price."""
-        return f"${obj.product.current_price}"
+        return f"${obj._unit_price:.2f}"
     unit_price.short_description = 'Unit Price'
+    unit_price.admin_order_field = '_unit_price'
 
     def get_queryset(self, request):
         """Optimize queryset with related fields."""
-        return super().get_queryset(request).select_related('cart__user', 'product')
+        return super().get_queryset(request).select_related(
+            'cart__user', 'product').annotate(
+            _unit_price=current_price_expression('product__'))
 
 
 @admin.register(CartCoupon)
@@ -114,6 +149,8 @@ class AppliedCouponAdmin(admin.ModelAdmin):
     """Applied coupon admin."""
 
     list_display = ('cart', 'coupon', 'discount_amount', 'applied_at')
+    list_select_related = ('cart__user', 'coupon')
+    raw_id_fields = ('cart', 'coupon')
     list_filter = ('applied_at',)
     search_fields = ('cart__user__email', 'coupon__code', 'coupon__name')
     ordering = ('-applied_at',)
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-15 22:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='appliedcoupon',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='cartitem',
+            unique_together=set(),
+        ),
+        migrations.AddIndex(
+            model_name='cartcoupon',
+            index=models.Index(fields=['is_active', 'valid_from', 'valid_until'], name='cart_cartco_is_acti_6b5033_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='appliedcoupon',
+            constraint=models.UniqueConstraint(fields=('cart', 'coupon'), name='uniq_cart_coupon'),
+        ),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.UniqueConstraint(fields=('cart', 'product'), name='uniq_cart_product'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-15 22:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0002_cart_constraints_and_coupon_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appliedcoupon',
+            index=models.Index(fields=['-applied_at'], name='cart_applie_applied_98e29f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cart',
+            index=models.Index(fields=['-created_at'], name='cart_cart_created_8a2171_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cartitem',
+            index=models.Index(fields=['-added_at'], name='cart_cartit_added_a_9af1d6_idx'),
+        ),
+    ]
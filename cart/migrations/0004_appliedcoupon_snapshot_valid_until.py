@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-15 22:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0003_cart_timestamp_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appliedcoupon',
+            name='snapshot_valid_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
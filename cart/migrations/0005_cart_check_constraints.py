@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-15 22:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0004_appliedcoupon_snapshot_valid_until'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='cartcoupon',
+            constraint=models.CheckConstraint(check=models.Q(('value__gte', 0)), name='cartcoupon_value_non_negative'),
+        ),
+        migrations.AddConstraint(
+            model_name='cartitem',
+            constraint=models.CheckConstraint(check=models.Q(('quantity__gt', 0)), name='cartitem_qty_pos'),
+        ),
+    ]
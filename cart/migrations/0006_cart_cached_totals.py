@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-15 22:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0005_cart_check_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='cached_total_items',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='cached_total_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=12, null=True),
+        ),
+    ]
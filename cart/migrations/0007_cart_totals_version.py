@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-15 23:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0006_cart_cached_totals'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='totals_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -1,9 +1,73 @@
-from django.db import models
+from decimal import Decimal
+from django.db import IntegrityError, models, transaction
+from django.db.models import (
+    DecimalField, ExpressionWrapper, F, Prefetch, Sum, Value
+)
+from django.db.models.functions import Coalesce, Least, NullIf
+from django.core.cache import cache
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from products.models import Product
 
 User = get_user_model()
 
+PRICE_FIELD = DecimalField(max_digits=12, decimal_places=2)
+
+# Flat 8.5% sales tax applied to cart totals
+TAX_MULTIPLIER = Decimal('1.085')
+HUNDRED = Decimal('100')
+
+
+def current_price_expression(prefix=''):
+    """
+    SQL equivalent of Product.current_price (sale price when set, otherwise
+    regular price) for the product reached through `prefix`.
+    """
+    return Coalesce(
+        NullIf(F(f'{prefix}sale_price'), Value(0)),
+        F(f'{prefix}price'),
+        output_field=PRICE_FIELD
+    )
+
+
+def line_total_expression(prefix=''):
+    """
+    SQL equivalent of CartItem.total_price (quantity * Product.current_price)
+    for the item reached through `prefix`, e.g. 'items__' from Cart.
+    """
+    return ExpressionWrapper(
+        F(f'{prefix}quantity') * current_price_expression(f'{prefix}product__'),
+        output_field=PRICE_FIELD
+    )
+
+# Product columns the cart's nested ProductListSerializer never reads
+CART_PRODUCT_DEFERRED_FIELDS = (
+    'product__description', 'product__release_date', 'product__sku',
+    'product__weight', 'product__dimensions', 'product__created_by',
+    'product__updated_by',
+)
+
+
+class CartQuerySet(models.QuerySet):
+    """QuerySet helpers for carts."""
+
+    def with_details(self):
+        """Load items, their products and images, and applied coupons up front."""
+        return self.select_related('user').prefetch_related(
+            Prefetch('items', queryset=CartItem.objects.select_related(
+                'product__category').defer(*CART_PRODUCT_DEFERRED_FIELDS)),
+            'items__product__images',
+            'applied_coupons__coupon',
+        )
+
+    def invalidate_totals(self):
+        """
+        Clear the denormalized totals so the next read recomputes them, and
+        bump the version so a read already in flight can't write them back.
+        """
+        return self.update(cached_total_items=None, cached_total_price=None,
+                           totals_version=F('totals_version') + 1)
+
 
 class Cart(models.Model):
     """Shopping cart for users."""
@@ -12,33 +76,106 @@ class Cart(models.Model):
         User, on_delete=models.CASCADE, related_name='carts')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized totals, cleared by cart/signals.py and refilled on read
+    cached_total_items = models.PositiveIntegerField(
+        blank=True, null=True, editable=False)
+    cached_total_price = models.DecimalField(
+        max_digits=12, decimal_places=2, blank=True, null=True, editable=False)
+    # Bumped by every invalidation; the write-back only lands if unchanged
+    totals_version = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = CartQuerySet.as_manager()
 
     def __str__(self):
         return f"Cart for {self.user.email}"
 
+    # Per-instance (total_items, total_price), filled on first access
+    _totals = None
+
+    def _get_totals(self):
+        """
+        Return (total_items, total_price), preferring prefetched items, then
+        the denormalized columns, then one aggregate query whose result is
+        stored back on the row.
+        """
+        if self._totals is None:
+            prefetched = getattr(self, '_prefetched_objects_cache', {})
+            if 'items' in prefetched:
+                total_items = 0
+                total_price = Decimal('0')
+                for item in prefetched['items']:
+                    total_items += item.quantity
+                    total_price += item.product.current_price * item.quantity
+                self._totals = (total_items, total_price)
+            elif (self.cached_total_items is not None and
+                    self.cached_total_price is not None):
+                self._totals = (self.cached_total_items,
+                                self.cached_total_price)
+            else:
+                totals = self.items.aggregate(
+                    total_items=Sum('quantity'),
+                    total_price=Sum(line_total_expression(),
+                                    output_field=PRICE_FIELD),
+                )
+                self._totals = (
+                    totals['total_items'] or 0,
+                    totals['total_price'] or Decimal('0'),
+                )
+                self.cached_total_items, self.cached_total_price = self._totals
+                # Skipped if the items changed since this row was read
+                Cart.objects.filter(
+                    pk=self.pk, totals_version=self.totals_version
+                ).update(
+                    cached_total_items=self.cached_total_items,
+                    cached_total_price=self.cached_total_price,
+                )
+        return self._totals
+
     @property
     def total_items(self):
         """Get total number of items in cart."""
-        return sum(item.quantity for item in self.items.all())
+        return self._get_totals()[0]
 
     @property
     def total_price(self):
         """Calculate total price of all items in cart."""
-        return sum(item.total_price for item in self.items.all())
+        return self._get_totals()[1]
+
+    # Per-instance sum of applied coupon discounts, filled on first access
+    _discount_amount = None
+
+    @property
+    def discount_amount(self):
+        """Get total discount from applied coupons."""
+        if self._discount_amount is None:
+            prefetched = getattr(self, '_prefetched_objects_cache', {})
+            if 'applied_coupons' in prefetched:
+                self._discount_amount = sum(
+                    (applied.discount_amount
+                     for applied in prefetched['applied_coupons']),
+                    Decimal('0'))
+            else:
+                self._discount_amount = self.applied_coupons.aggregate(
+                    total=Sum('discount_amount'))['total'] or Decimal('0')
+        return self._discount_amount
 
     @property
     def total_price_with_tax(self):
         """Calculate total price including tax (assuming 8.5% tax rate)."""
-        from decimal import Decimal
-        return self.total_price * Decimal('1.085')
+        return self.total_price * TAX_MULTIPLIER
 
     def clear(self):
         """Clear all items from cart."""
         self.items.all().delete()
+        self._totals = None
+        self.cached_total_items = self.cached_total_price = None
 
     class Meta:
         verbose_name = 'Cart'
         verbose_name_plural = 'Carts'
+        indexes = [
+            models.Index(fields=['-created_at']),
+        ]
 
 
 class CartItem(models.Model):
@@ -54,6 +191,83 @@ class CartItem(models.Model):
     def __str__(self):
         return f"{self.quantity}x {self.product.name} in {self.cart}"
 
+    @classmethod
+    def add_quantity(cls, cart, product_id, quantity, stock_quantity,
+                     clamp=False):
+        """
+        Add `quantity` of a product to `cart`, incrementing an existing line in
+        SQL or inserting a new one. With `clamp` the resulting quantity is
+        capped at `stock_quantity`; otherwise an increment that would exceed
+        it is refused. Returns False if nothing was changed.
+        """
+        items = cls.objects.filter(cart=cart, product_id=product_id)
+        if clamp:
+            new_quantity = Least(F('quantity') + quantity, Value(stock_quantity))
+        else:
+            items = items.filter(quantity__lte=stock_quantity - quantity)
+            new_quantity = F('quantity') + quantity
+
+        with transaction.atomic():
+            if not items.update(quantity=new_quantity, updated_at=timezone.now()):
+                try:
+                    with transaction.atomic():
+                        cls.objects.create(
+                            cart=cart, product_id=product_id, quantity=quantity)
+                    return True
+                except IntegrityError:
+                    # The line exists and is over stock, or was just added
+                    # by a concurrent request
+                    if not items.update(quantity=new_quantity,
+                                        updated_at=timezone.now()):
+                        return False
+            # update() sends no post_save signals
+            Cart.objects.filter(pk=cart.pk).invalidate_totals()
+        return True
+
+    @classmethod
+    def bulk_merge(cls, cart, items):
+        """
+        Merge `items` ({'product_id', 'quantity'} dicts) into `cart`, adding
+        to existing quantities. Malformed lines, lines for inactive products
+        and lines that would exceed available stock are skipped. Returns the
+        number of rows written.
+        """
+        lines = []
+        for item in items:
+            try:
+                lines.append((int(item['product_id']),
+                              int(item.get('quantity', 1))))
+            except (KeyError, TypeError, ValueError):
+                continue
+
+        stocks = dict(Product.objects.filter(
+            id__in={product_id for product_id, _ in lines}, is_active=True
+        ).values_list('id', 'stock_quantity'))
+        quantities = dict(cls.objects.filter(
+            cart=cart, product_id__in=stocks
+        ).values_list('product_id', 'quantity'))
+
+        merged = {}
+        for product_id, quantity in lines:
+            if product_id not in stocks or quantity < 1:
+                continue
+            new_quantity = quantities.get(product_id, 0) + quantity
+            if new_quantity <= stocks[product_id]:
+                quantities[product_id] = merged[product_id] = new_quantity
+
+        if merged:
+            cls.objects.bulk_create(
+                [cls(cart=cart, product_id=product_id, quantity=quantity)
+                 for product_id, quantity in merged.items()],
+                update_conflicts=True,
+                update_fields=['quantity', 'updated_at'],
+                unique_fields=['cart', 'product'],
+            )
+            # bulk_create sends no post_save signals
+            Cart.objects.filter(pk=cart.pk).invalidate_totals()
+            cart._totals = cart.cached_total_items = cart.cached_total_price = None
+        return len(merged)
+
     @property
     def total_price(self):
         """Calculate total price for this item."""
@@ -66,15 +280,59 @@ class CartItem(models.Model):
 
     def save(self, *args, **kwargs):
         # Ensure quantity doesn't exceed available stock
+        # (never below 1, which the quantity check constraint forbids)
         if self.product.stock_quantity < self.quantity:
-            self.quantity = self.product.stock_quantity
+            self.quantity = max(self.product.stock_quantity, 1)
         super().save(*args, **kwargs)
 
     class Meta:
         verbose_name = 'Cart Item'
         verbose_name_plural = 'Cart Items'
-        unique_together = ['cart', 'product']
         ordering = ['-added_at']
+        indexes = [
+            models.Index(fields=['-added_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['cart', 'product'], name='uniq_cart_product'),
+            models.CheckConstraint(
+                check=models.Q(quantity__gt=0), name='cartitem_qty_pos'),
+        ]
+
+COUPON_CACHE_TIMEOUT = 300  # 5 minutes
+
+
+def coupon_cache_key(code):
+    """Cache key for the coupon with the given (upper-case) code."""
+    return f"cart:coupon:{code}"
+
+
+def get_coupon_by_code(code):
+    """
+    Return the coupon for `code` read through the cache, or None. The cached
+    used_count may lag; redemption re-checks it in SQL.
+    """
+    key = coupon_cache_key(code)
+    coupon = cache.get(key)
+    if coupon is None:
+        coupon = CartCoupon.objects.filter(code=code).first()
+        if coupon is not None:
+            cache.set(key, coupon, COUPON_CACHE_TIMEOUT)
+    return coupon
+
+
+class CartCouponQuerySet(models.QuerySet):
+    """QuerySet helpers for coupons."""
+
+    def valid(self):
+        """Coupons that are active, in their validity window and not used up."""
+        now = timezone.now()
+        return self.filter(
+            is_active=True, valid_from__lte=now, valid_until__gte=now
+        ).filter(
+            models.Q(usage_limit__isnull=True) |
+            models.Q(used_count__lt=F('usage_limit'))
+        )
 
 
 class CartCoupon(models.Model):
@@ -103,14 +361,18 @@ class CartCoupon(models.Model):
     valid_until = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = CartCouponQuerySet.as_manager()
+
     def __str__(self):
         return f"{self.code} - {self.name}"
 
     @property
     def is_valid(self):
         """Check if the coupon is still valid."""
-        from django.utils import timezone
-        now = timezone.now()
+        return self.is_valid_at(timezone.now())
+
+    def is_valid_at(self, now):
+        """Check if the coupon is valid at the given time."""
         return (
             self.is_active and
             self.valid_from <= now <= self.valid_until and
@@ -119,13 +381,11 @@ class CartCoupon(models.Model):
 
     def calculate_discount(self, cart_total):
         """Calculate discount amount for given cart total."""
-        from decimal import Decimal
-
         if not self.is_valid or cart_total < self.minimum_purchase:
             return 0
 
         if self.coupon_type == 'percentage':
-            discount = cart_total * (self.value / Decimal('100'))
+            discount = cart_total * (self.value / HUNDRED)
             if self.maximum_discount:
                 discount = min(discount, self.maximum_discount)
             return discount
@@ -140,6 +400,13 @@ class CartCoupon(models.Model):
         verbose_name = 'Cart Coupon'
         verbose_name_plural = 'Cart Coupons'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['is_active', 'valid_from', 'valid_until']),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(value__gte=0), name='cartcoupon_value_non_negative'),
+        ]
 
 
 class AppliedCoupon(models.Model):
@@ -149,12 +416,25 @@ class AppliedCoupon(models.Model):
         Cart, on_delete=models.CASCADE, related_name='applied_coupons')
     coupon = models.ForeignKey(CartCoupon, on_delete=models.CASCADE)
     discount_amount = models.DecimalField(max_digits=10, decimal_places=2)
+    # Coupon expiry copied at apply-time so reads need not consult the coupon
+    snapshot_valid_until = models.DateTimeField(blank=True, null=True)
     applied_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
         return f"{self.coupon.code} applied to {self.cart}"
 
+    def is_expired_at(self, now):
+        """Check the snapshotted expiry against the given time."""
+        return (self.snapshot_valid_until is not None and
+                self.snapshot_valid_until < now)
+
     class Meta:
         verbose_name = 'Applied Coupon'
         verbose_name_plural = 'Applied Coupons'
-        unique_together = ['cart', 'coupon']
+        indexes = [
+            models.Index(fields=['-applied_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['cart', 'coupon'], name='uniq_cart_coupon'),
+        ]
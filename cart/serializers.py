@@ -1,15 +1,50 @@
+from decimal import Decimal
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from products.models import Product
 from products.serializers import ProductListSerializer
-from .models import Cart, CartItem, CartCoupon, AppliedCoupon
+from gundam_ccs.renderers import to_plain
+from .models import (
+    Cart, CartItem, CartCoupon, AppliedCoupon, TAX_MULTIPLIER, get_coupon_by_code
+)
 
 User = get_user_model()
 
+PRODUCT_CACHE_TIMEOUT = 300  # 5 minutes
+
+# Positive quantities are also enforced by the cartitem_qty_pos constraint
+QUANTITY_KWARGS = {
+    'min_value': 1,
+    'error_messages': {'min_value': 'Quantity must be greater than 0.'},
+}
+
+
+class CachedProductListSerializer(ProductListSerializer):
+    """ProductListSerializer that reuses rendered output per product version."""
+
+    def to_representation(self, instance):
+        """Return cached product data keyed by id and updated_at."""
+        request = self.context.get('request')
+        base_url = request.build_absolute_uri('/') if request else ''
+        key = f"cart:product:{instance.pk}:{instance.updated_at.timestamp()}:{base_url}"
+
+        local = self.context.setdefault('_product_cache', {})
+        data = local.get(key)
+        if data is None:
+            data = cache.get(key)
+            if data is None:
+                data = to_plain(super().to_representation(instance))
+                cache.set(key, data, PRODUCT_CACHE_TIMEOUT)
+            local[key] = data
+        return data
+
 
 class CartItemSerializer(serializers.ModelSerializer):
     """Serializer for cart items."""
 
-    product = ProductListSerializer(read_only=True)
+    product = CachedProductListSerializer(read_only=True)
     product_id = serializers.IntegerField(write_only=True)
     total_price = serializers.SerializerMethodField()
     is_available = serializers.SerializerMethodField()
@@ -29,13 +64,6 @@ class CartItemSerializer(serializers.ModelSerializer):
         """Check if the product is available in the requested quantity."""
         return obj.is_available
 
-    def validate_quantity(self, value):
-        """Validate quantity."""
-        if value <= 0:
-            raise serializers.ValidationError(
-                'Quantity must be greater than 0.')
-        return value
-
 
 class CartItemCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating cart items."""
@@ -45,27 +73,26 @@ class CartItemCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = CartItem
         fields = ('product_id', 'quantity')
+        extra_kwargs = {'quantity': QUANTITY_KWARGS}
 
     def validate(self, attrs):
         """Validate cart item data."""
-        from products.models import Product
-
         product_id = attrs['product_id']
         quantity = attrs.get('quantity', 1)
 
-        try:
-            product = Product.objects.get(id=product_id, is_active=True)
-        except Product.DoesNotExist:
+        product = Product.objects.filter(id=product_id, is_active=True).values(
+            'in_stock', 'stock_quantity').first()
+        if product is None:
             raise serializers.ValidationError('Product not found.')
 
-        if not product.in_stock:
+        if not product['in_stock']:
             raise serializers.ValidationError('Product is out of stock.')
 
-        if product.stock_quantity < quantity:
+        if product['stock_quantity'] < quantity:
             raise serializers.ValidationError(
-                f'Only {product.stock_quantity} items available in stock.')
+                f"Only {product['stock_quantity']} items available in stock.")
 
-        attrs['product'] = product
+        self.context['stock_quantity'] = product['stock_quantity']
         return attrs
 
 
@@ -75,13 +102,10 @@ class CartItemUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = CartItem
         fields = ('quantity',)
+        extra_kwargs = {'quantity': QUANTITY_KWARGS}
 
     def validate_quantity(self, value):
         """Validate quantity."""
-        if value <= 0:
-            raise serializers.ValidationError(
-                'Quantity must be greater than 0.')
-
         # Check stock availability
         if hasattr(self, 'instance') and self.instance:
             if self.instance.product.stock_quantity < value:
@@ -105,18 +129,35 @@ class CartCouponSerializer(serializers.ModelSerializer):
 
     def get_is_valid(self, obj):
         """Check if the coupon is valid."""
-        return obj.is_valid
+        now = self.context.get('_now') or timezone.now()
+        return obj.is_valid_at(now)
+
+
+class AppliedCartCouponSerializer(CartCouponSerializer):
+    """Coupon nested in an applied coupon, which reports its own expiry."""
+
+    is_valid = None
+
+    class Meta(CartCouponSerializer.Meta):
+        fields = tuple(field for field in CartCouponSerializer.Meta.fields
+                       if field != 'is_valid')
 
 
 class AppliedCouponSerializer(serializers.ModelSerializer):
     """Serializer for applied coupons."""
 
-    coupon = CartCouponSerializer(read_only=True)
+    coupon = AppliedCartCouponSerializer(read_only=True)
+    is_expired = serializers.SerializerMethodField()
 
     class Meta:
         model = AppliedCoupon
-        fields = ('id', 'coupon', 'discount_amount', 'applied_at')
-        read_only_fields = ('id', 'discount_amount', 'applied_at')
+        fields = ('id', 'coupon', 'discount_amount', 'is_expired', 'applied_at')
+        read_only_fields = ('id', 'discount_amount', 'is_expired', 'applied_at')
+
+    def get_is_expired(self, obj):
+        """Check expiry from the applied-time snapshot."""
+        now = self.context.get('_now') or timezone.now()
+        return obj.is_expired_at(now)
 
 
 class CartSerializer(serializers.ModelSerializer):
@@ -124,40 +165,27 @@ class CartSerializer(serializers.ModelSerializer):
 
     items = CartItemSerializer(many=True, read_only=True)
     applied_coupons = AppliedCouponSerializer(many=True, read_only=True)
-    total_items = serializers.SerializerMethodField()
-    total_price = serializers.SerializerMethodField()
-    total_price_with_tax = serializers.SerializerMethodField()
-    discount_amount = serializers.SerializerMethodField()
-    final_price = serializers.SerializerMethodField()
 
     class Meta:
         model = Cart
-        fields = ('id', 'user', 'items', 'applied_coupons', 'total_items', 'total_price',
-                  'total_price_with_tax', 'discount_amount', 'final_price', 'created_at', 'updated_at')
-        read_only_fields = ('id', 'user', 'total_items', 'total_price', 'total_price_with_tax',
-                            'discount_amount', 'final_price', 'created_at', 'updated_at')
-
-    def get_total_items(self, obj):
-        """Get total number of items in cart."""
-        return obj.total_items
-
-    def get_total_price(self, obj):
-        """Get total price of all items in cart."""
-        return obj.total_price
-
-    def get_total_price_with_tax(self, obj):
-        """Get total price including tax."""
-        return obj.total_price_with_tax
-
-    def get_discount_amount(self, obj):
-        """Calculate total discount from applied coupons."""
-        return sum(coupon.discount_amount for coupon in obj.applied_coupons.all())
-
-    def get_final_price(self, obj):
-        """Calculate final price after discounts."""
-        total_price = obj.total_price
-        discount_amount = self.get_discount_amount(obj)
-        return max(0, total_price - discount_amount)
+        fields = ('id', 'user', 'items', 'applied_coupons',
+                  'created_at', 'updated_at')
+        read_only_fields = ('id', 'user', 'created_at', 'updated_at')
+
+    def to_representation(self, instance):
+        """Add cart totals, computed once, alongside the model fields."""
+        # Share one timestamp across nested coupon validity checks
+        self.context['_now'] = timezone.now()
+        data = super().to_representation(instance)
+
+        total_price = instance.total_price
+        discount_amount = instance.discount_amount
+        data['total_items'] = instance.total_items
+        data['total_price'] = total_price
+        data['total_price_with_tax'] = total_price * TAX_MULTIPLIER
+        data['discount_amount'] = discount_amount
+        data['final_price'] = max(Decimal('0'), total_price - discount_amount)
+        return data
 
 
 class ApplyCouponSerializer(serializers.Serializer):
@@ -167,13 +195,13 @@ class ApplyCouponSerializer(serializers.Serializer):
 
     def validate_coupon_code(self, value):
         """Validate coupon code."""
-        try:
-            coupon = CartCoupon.objects.get(code=value.upper())
-            if not coupon.is_valid:
-                raise serializers.ValidationError('Coupon is not valid.')
-        except CartCoupon.DoesNotExist:
+        coupon = get_coupon_by_code(value.upper())
+        if coupon is None:
             raise serializers.ValidationError('Invalid coupon code.')
+        if not coupon.is_valid:
+            raise serializers.ValidationError('Coupon is not valid.')
 
+        self.context['coupon'] = coupon
         return value
 
 
@@ -202,10 +230,8 @@ class CartSummarySerializer(serializers.ModelSerializer):
 
     def get_discount_amount(self, obj):
         """Calculate total discount from applied coupons."""
-        return sum(coupon.discount_amount for coupon in obj.applied_coupons.all())
+        return obj.discount_amount
 
     def get_final_price(self, obj):
         """Calculate final price after discounts."""
-        total_price = obj.total_price
-        discount_amount = self.get_discount_amount(obj)
-        return max(0, total_price - discount_amount)
+        return max(0, obj.total_price - obj.discount_amount)
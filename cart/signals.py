@@ -0,0 +1,46 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from products.models import Product
+from .models import Cart, CartItem, CartCoupon, coupon_cache_key
+
+# Product fields that feed Cart.total_price
+PRICE_FIELDS = {'price', 'sale_price'}
+
+
+@receiver(post_save, sender=CartItem)
+@receiver(post_delete, sender=CartItem)
+def cart_item_changed(sender, instance, **kwargs):
+    """Invalidate the owning cart's totals when one of its items changes."""
+    Cart.objects.filter(pk=instance.cart_id).invalidate_totals()
+
+
+@receiver(post_save, sender=Product)
+def product_price_changed(sender, instance, update_fields=None, **kwargs):
+    """Invalidate totals of carts holding a product whose price may have changed."""
+    if kwargs.get('created'):
+        return
+    if update_fields is not None and not PRICE_FIELDS & set(update_fields):
+        return
+    Cart.objects.filter(items__product=instance).invalidate_totals()
+
+
+@receiver(pre_save, sender=CartCoupon)
+def coupon_saving(sender, instance, update_fields=None, **kwargs):
+    """Remember the stored code, so a rename also drops the old cache key."""
+    instance._old_code = None
+    if instance.pk is None:
+        return
+    if update_fields is not None and 'code' not in update_fields:
+        return
+    instance._old_code = sender.objects.filter(
+        pk=instance.pk).values_list('code', flat=True).first()
+
+
+@receiver(post_save, sender=CartCoupon)
+@receiver(post_delete, sender=CartCoupon)
+def coupon_changed(sender, instance, **kwargs):
+    """Drop the cached copy of a coupon, under its old code too."""
+    codes = {instance.code, getattr(instance, '_old_code', None)} - {None}
+    cache.delete_many([coupon_cache_key(code) for code in codes])
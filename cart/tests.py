@@ -1,3 +1,200 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from products.models import Category, Product
+from .models import AppliedCoupon, Cart, CartCoupon, CartItem
+from .valuation import cart_totals
+
+User = get_user_model()
+
+# The project falls back to a database cache whose table tests don't create
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def make_product(category, sku, price, **kwargs):
+    """Create an in-stock product with an explicit SKU."""
+    return Product.objects.create(
+        name=sku, description='Kit', category=category, sku=sku,
+        price=Decimal(price), stock_quantity=kwargs.pop('stock_quantity', 10),
+        **kwargs)
+
+
+def make_coupon(code, **kwargs):
+    """Create a coupon valid from yesterday until tomorrow."""
+    now = timezone.now()
+    defaults = {
+        'name': code, 'coupon_type': 'percentage', 'value': Decimal('10'),
+        'valid_from': now - timezone.timedelta(days=1),
+        'valid_until': now + timezone.timedelta(days=1),
+    }
+    defaults.update(kwargs)
+    return CartCoupon.objects.create(code=code, **defaults)
+
+
+class CartTotalsTest(TestCase):
+    """cart_totals against the per-cart properties."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='High Grade')
+        cls.kit = make_product(category, 'KIT-1', '20.00')
+        cls.sale_kit = make_product(category, 'KIT-2', '40.00',
+                                    sale_price=Decimal('30.00'))
+        coupon = make_coupon('TEN')
+
+        cls.carts = []
+        for index, quantity in enumerate((1, 3)):
+            user = User.objects.create_user(
+                email=f'user{index}@example.com', username=f'user{index}',
+                password='x')
+            cart = Cart.objects.create(user=user)
+            CartItem.objects.create(cart=cart, product=cls.kit, quantity=quantity)
+            CartItem.objects.create(cart=cart, product=cls.sale_kit, quantity=2)
+            cls.carts.append(cart)
+        AppliedCoupon.objects.create(
+            cart=cls.carts[0], coupon=coupon, discount_amount=Decimal('5.00'))
+
+    def assertMatchesProperties(self, totals):
+        for cart in self.carts:
+            cart = Cart.objects.get(pk=cart.pk)
+            self.assertEqual(
+                totals[cart.pk],
+                (cart.total_items, cart.total_price, cart.discount_amount))
+
+    def test_all_carts(self):
+        self.assertMatchesProperties(cart_totals())
+
+    def test_queryset(self):
+        self.assertMatchesProperties(
+            cart_totals(Cart.objects.filter(pk__in=[c.pk for c in self.carts])))
+
+    def test_one_shot_iterator(self):
+        totals = cart_totals(iter([cart.pk for cart in self.carts]))
+        self.assertMatchesProperties(totals)
+        self.assertEqual(totals[self.carts[0].pk][2], Decimal('5.00'))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CartTotalsInvalidationTest(TestCase):
+    """Denormalized cart totals are cleared by every kind of item change."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Master Grade')
+        cls.kit = make_product(category, 'MG-1', '50.00')
+        cls.other_kit = make_product(category, 'MG-2', '25.00')
+        cls.user = User.objects.create_user(
+            email='buyer@example.com', username='buyer', password='x')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.cart = Cart.objects.create(user=self.user)
+        self.item = CartItem.objects.create(
+            cart=self.cart, product=self.kit, quantity=1)
+        # Fill the cached columns, as a cart read would
+        self.assertEqual(Cart.objects.get(pk=self.cart.pk).total_price,
+                         Decimal('50.00'))
+        self.assertIsNotNone(Cart.objects.get(pk=self.cart.pk).cached_total_price)
+
+    def assertTotals(self, total_items, total_price):
+        cart = Cart.objects.get(pk=self.cart.pk)
+        self.assertIsNone(cart.cached_total_price)
+        self.assertEqual((cart.total_items, cart.total_price),
+                         (total_items, Decimal(total_price)))
+
+    def test_add(self):
+        response = self.client.post('/api/v1/cart/add/', {
+            'product_id': self.other_kit.pk, 'quantity': 2}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTotals(3, '100.00')
+
+    def test_add_to_existing_line(self):
+        response = self.client.post('/api/v1/cart/add/', {
+            'product_id': self.kit.pk, 'quantity': 1}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTotals(2, '100.00')
+
+    def test_update(self):
+        response = self.client.patch(
+            f'/api/v1/cart/items/{self.item.pk}/', {'quantity': 3}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTotals(3, '150.00')
+
+    def test_remove(self):
+        response = self.client.delete(f'/api/v1/cart/remove/{self.item.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertTotals(0, '0')
+
+    def test_merge(self):
+        response = self.client.post('/api/v1/cart/merge/', {'guest_cart': [
+            {'product_id': self.kit.pk, 'quantity': 1},
+            {'product_id': self.other_kit.pk, 'quantity': 1},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertTotals(3, '125.00')
+
+    def test_price_change(self):
+        self.kit.price = Decimal('40.00')
+        self.kit.save()
+        self.assertTotals(1, '40.00')
+
+    def test_stale_write_back_is_dropped(self):
+        Cart.objects.filter(pk=self.cart.pk).invalidate_totals()
+        reader = Cart.objects.get(pk=self.cart.pk)
+        CartItem.objects.create(cart=self.cart, product=self.other_kit, quantity=1)
+        # The reader's aggregate may land, but not over the newer invalidation
+        reader.total_price
+        self.assertTotals(2, '75.00')
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ApplyCouponLimitTest(TestCase):
+    """Coupon usage limits hold when applying coupons to carts."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Real Grade')
+        cls.kit = make_product(category, 'RG-1', '30.00')
+
+    def setUp(self):
+        cache.clear()
+
+    def apply(self, user, code):
+        cart = Cart.objects.create(user=user)
+        CartItem.objects.create(cart=cart, product=self.kit, quantity=1)
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.post('/api/v1/cart/coupons/apply/',
+                           {'coupon_code': code}, format='json')
+
+    def make_user(self, name):
+        return User.objects.create_user(
+            email=f'{name}@example.com', username=name, password='x')
+
+    def test_usage_limit(self):
+        coupon = make_coupon('ONCE', usage_limit=1)
+        self.assertEqual(self.apply(self.make_user('first'), 'once').status_code, 200)
+        # The cached coupon still shows no uses; the SQL claim refuses it
+        response = self.apply(self.make_user('second'), 'ONCE')
+        self.assertEqual(response.status_code, 400)
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.used_count, 1)
+
+    def test_deactivated_coupon(self):
+        coupon = make_coupon('GONE')
+        self.assertEqual(self.apply(self.make_user('first'), 'GONE').status_code, 200)
+        coupon.is_active = False
+        coupon.save()
+        self.assertEqual(self.apply(self.make_user('second'), 'GONE').status_code, 400)
+
+    def test_minimum_purchase(self):
+        make_coupon('BIG', minimum_purchase=Decimal('100.00'))
+        self.assertEqual(self.apply(self.make_user('first'), 'BIG').status_code, 400)
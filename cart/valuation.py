@@ -0,0 +1,37 @@
+from decimal import Decimal
+from django.db.models import QuerySet, Sum
+
+from .models import AppliedCoupon, CartItem, PRICE_FIELD, line_total_expression
+
+ZERO = Decimal('0')
+
+
+def cart_totals(carts=None):
+    """
+    Value many carts at once for batch jobs (analytics, abandoned-cart emails).
+
+    Returns {cart_id: (total_items, total_price, discount_amount)} computed with
+    one grouped query for items and one for applied coupons, instead of
+    evaluating the per-cart properties in a loop. `carts` may be a Cart
+    queryset or an iterable of cart ids; by default every cart is valued.
+    """
+    items = CartItem.objects.all()
+    coupons = AppliedCoupon.objects.all()
+    if carts is not None:
+        # Read once: both filters below need it, and an iterator is one-shot
+        carts = carts.values('pk') if isinstance(carts, QuerySet) else list(carts)
+        items = items.filter(cart__in=carts)
+        coupons = coupons.filter(cart__in=carts)
+
+    totals = {}
+    for row in items.order_by().values('cart_id').annotate(
+            total_items=Sum('quantity'),
+            total_price=Sum(line_total_expression(), output_field=PRICE_FIELD)):
+        totals[row['cart_id']] = (row['total_items'], row['total_price'], ZERO)
+
+    for row in coupons.order_by().values('cart_id').annotate(
+            discount=Sum('discount_amount')):
+        total_items, total_price, _ = totals.get(row['cart_id'], (0, ZERO, ZERO))
+        totals[row['cart_id']] = (total_items, total_price, row['discount'])
+
+    return totals
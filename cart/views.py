@@ -2,10 +2,16 @@ from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.views.decorators.http import require_GET
 import logging
 
+from accounts.authentication import jwt_authentication
 from .models import Cart, CartItem, CartCoupon, AppliedCoupon
 from .serializers import (
     CartSerializer, CartItemSerializer, CartItemCreateSerializer,
@@ -16,6 +22,15 @@ from .serializers import (
 logger = logging.getLogger(__name__)
 
 
+def get_user_cart(request):
+    """Get or create the user's cart once and reuse it for the rest of the request."""
+    cart = getattr(request, '_user_cart', None)
+    if cart is None:
+        cart, created = Cart.objects.get_or_create(user=request.user)
+        request._user_cart = cart
+    return cart
+
+
 class CartView(APIView):
     """Cart view for getting and clearing cart."""
 
@@ -24,7 +39,8 @@ class CartView(APIView):
     def get(self, request):
         """Get user's cart."""
         try:
-            cart, created = Cart.objects.get_or_create(user=request.user)
+            cart, created = Cart.objects.with_details().get_or_create(
+                user=request.user)
             serializer = CartSerializer(cart)
             return Response(serializer.data)
         except Exception as e:
@@ -38,11 +54,11 @@ class CartView(APIView):
     def delete(self, request):
         """Clear user's cart."""
         try:
-            cart = Cart.objects.get(user=request.user)
+            cart = Cart.objects.filter(user=request.user).first()
+            if cart is None:
+                return Response({'message': 'Cart is already empty.'}, status=status.HTTP_200_OK)
             cart.clear()
             return Response({'message': 'Cart cleared successfully.'}, status=status.HTTP_200_OK)
-        except Cart.DoesNotExist:
-            return Response({'message': 'Cart is already empty.'}, status=status.HTTP_200_OK)
         except Exception as e:
             logger.error(
                 f"Error clearing cart for user {request.user.id}: {str(e)}")
@@ -59,7 +75,9 @@ class CartSummaryView(APIView):
 
     def get(self, request):
         """Get cart summary."""
-        cart, created = Cart.objects.get_or_create(user=request.user)
+        # Totals come from the denormalized columns; only coupons are needed
+        cart, created = Cart.objects.prefetch_related(
+            'applied_coupons').get_or_create(user=request.user)
         serializer = CartSummarySerializer(cart)
         return Response(serializer.data)
 
@@ -72,7 +90,7 @@ class CartItemListView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         """Get user's cart items."""
-        cart, created = Cart.objects.get_or_create(user=self.request.user)
+        cart = get_user_cart(self.request)
         return CartItem.objects.filter(cart=cart).select_related('product')
 
     def get_serializer_class(self):
@@ -83,22 +101,16 @@ class CartItemListView(generics.ListCreateAPIView):
 
     def perform_create(self, serializer):
         """Create cart item."""
-        cart, created = Cart.objects.get_or_create(user=self.request.user)
-
-        # Check if item already exists in cart
-        existing_item = CartItem.objects.filter(
-            cart=cart,
-            product=serializer.validated_data['product']
-        ).first()
-
-        if existing_item:
-            # Update quantity
-            existing_item.quantity += serializer.validated_data.get(
-                'quantity', 1)
-            existing_item.save()
-        else:
-            # Create new item
-            serializer.save(cart=cart)
+        cart = get_user_cart(self.request)
+
+        # Add to any existing line, capping the quantity at available stock
+        CartItem.add_quantity(
+            cart,
+            serializer.validated_data['product_id'],
+            serializer.validated_data.get('quantity', 1),
+            serializer.context['stock_quantity'],
+            clamp=True
+        )
 
 
 class CartItemDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -109,7 +121,7 @@ class CartItemDetailView(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self):
         """Get user's cart items."""
-        cart, created = Cart.objects.get_or_create(user=self.request.user)
+        cart = get_user_cart(self.request)
         return CartItem.objects.filter(cart=cart).select_related('product')
 
     def get_serializer_class(self):
@@ -134,21 +146,9 @@ class ApplyCouponView(APIView):
         """Apply coupon to cart."""
         serializer = ApplyCouponSerializer(data=request.data)
         if serializer.is_valid():
-            coupon_code = serializer.validated_data['coupon_code']
-
-            try:
-                coupon = CartCoupon.objects.get(code=coupon_code.upper())
-            except CartCoupon.DoesNotExist:
-                return Response({'error': 'Invalid coupon code.'}, status=status.HTTP_400_BAD_REQUEST)
+            coupon = serializer.context['coupon']
 
-            if not coupon.is_valid:
-                return Response({'error': 'Coupon is not valid.'}, status=status.HTTP_400_BAD_REQUEST)
-
-            cart, created = Cart.objects.get_or_create(user=request.user)
-
-            # Check if coupon is already applied
-            if AppliedCoupon.objects.filter(cart=cart, coupon=coupon).exists():
-                return Response({'error': 'Coupon is already applied.'}, status=status.HTTP_400_BAD_REQUEST)
+            cart = get_user_cart(request)
 
             # Check minimum purchase requirement
             if cart.total_price < coupon.minimum_purchase:
@@ -159,16 +159,24 @@ class ApplyCouponView(APIView):
             # Calculate discount
             discount_amount = coupon.calculate_discount(cart.total_price)
 
-            # Apply coupon
-            AppliedCoupon.objects.create(
-                cart=cart,
-                coupon=coupon,
-                discount_amount=discount_amount
-            )
-
-            # Update coupon usage count
-            coupon.used_count += 1
-            coupon.save()
+            try:
+                with transaction.atomic():
+                    # Claim a use only while the coupon is still valid, so
+                    # concurrent applies cannot overrun usage_limit
+                    if not CartCoupon.objects.valid().filter(pk=coupon.pk).update(
+                            used_count=F('used_count') + 1):
+                        return Response({'error': 'Coupon is not valid.'},
+                                        status=status.HTTP_400_BAD_REQUEST)
+
+                    # Apply coupon; uniq_cart_coupon rejects a second apply
+                    AppliedCoupon.objects.create(
+                        cart=cart,
+                        coupon=coupon,
+                        discount_amount=discount_amount,
+                        snapshot_valid_until=coupon.valid_until
+                    )
+            except IntegrityError:
+                return Response({'error': 'Coupon is already applied.'}, status=status.HTTP_400_BAD_REQUEST)
 
             return Response({
                 'message': 'Coupon applied successfully.',
@@ -185,16 +193,15 @@ class RemoveCouponView(APIView):
 
     def delete(self, request, coupon_id):
         """Remove coupon from cart."""
-        cart, created = Cart.objects.get_or_create(user=request.user)
+        cart = get_user_cart(request)
 
-        try:
-            applied_coupon = AppliedCoupon.objects.get(cart=cart, id=coupon_id)
-            applied_coupon.delete()
-
-            return Response({'message': 'Coupon removed successfully.'}, status=status.HTTP_200_OK)
-        except AppliedCoupon.DoesNotExist:
+        deleted, _ = AppliedCoupon.objects.filter(
+            cart=cart, id=coupon_id).delete()
+        if not deleted:
             return Response({'error': 'Coupon not found in cart.'}, status=status.HTTP_404_NOT_FOUND)
 
+        return Response({'message': 'Coupon removed successfully.'}, status=status.HTTP_200_OK)
+
 
 class CartCouponListView(generics.ListAPIView):
     """Cart coupon list view (admin only)."""
@@ -212,7 +219,7 @@ class AppliedCouponListView(generics.ListAPIView):
 
     def get_queryset(self):
         """Get applied coupons for user's cart."""
-        cart, created = Cart.objects.get_or_create(user=self.request.user)
+        cart = get_user_cart(self.request)
         return AppliedCoupon.objects.filter(cart=cart).select_related('coupon')
 
 
@@ -220,12 +227,11 @@ class AppliedCouponListView(generics.ListAPIView):
 @permission_classes([permissions.IsAuthenticated])
 def update_cart_item_quantity(request, item_id):
     """Update cart item quantity."""
-    try:
-        cart_item = CartItem.objects.get(
-            id=item_id,
-            cart__user=request.user
-        )
-    except CartItem.DoesNotExist:
+    cart_item = CartItem.objects.select_related('product__category').filter(
+        id=item_id,
+        cart__user=request.user
+    ).first()
+    if cart_item is None:
         return Response({'error': 'Cart item not found.'}, status=status.HTTP_404_NOT_FOUND)
 
     quantity = request.data.get('quantity')
@@ -238,8 +244,15 @@ def update_cart_item_quantity(request, item_id):
             'error': f'Only {cart_item.product.stock_quantity} items available in stock.'
         }, status=status.HTTP_400_BAD_REQUEST)
 
+    # Set the quantity only while stock still covers it, in one statement
+    if not CartItem.objects.filter(
+        pk=cart_item.pk, product__stock_quantity__gte=quantity
+    ).update(quantity=quantity, updated_at=timezone.now()):
+        return Response({
+            'error': 'Not enough items available in stock.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    Cart.objects.filter(pk=cart_item.cart_id).invalidate_totals()
     cart_item.quantity = quantity
-    cart_item.save()
 
     serializer = CartItemSerializer(cart_item)
     return Response(serializer.data)
@@ -251,35 +264,19 @@ def add_to_cart(request):
     """Add product to cart."""
     serializer = CartItemCreateSerializer(data=request.data)
     if serializer.is_valid():
-        cart, created = Cart.objects.get_or_create(user=request.user)
-        product = serializer.validated_data['product']
+        cart = get_user_cart(request)
+        product_id = serializer.validated_data['product_id']
         quantity = serializer.validated_data.get('quantity', 1)
+        stock_quantity = serializer.context['stock_quantity']
 
-        # Check if item already exists in cart
-        existing_item = CartItem.objects.filter(
-            cart=cart,
-            product=product
-        ).first()
-
-        if existing_item:
-            # Update quantity
-            new_quantity = existing_item.quantity + quantity
-            if new_quantity > product.stock_quantity:
-                return Response({
-                    'error': f'Only {product.stock_quantity} items available in stock.'
-                }, status=status.HTTP_400_BAD_REQUEST)
-
-            existing_item.quantity = new_quantity
-            existing_item.save()
-            cart_item = existing_item
-        else:
-            # Create new item
-            cart_item = CartItem.objects.create(
-                cart=cart,
-                product=product,
-                quantity=quantity
-            )
+        # Add to any existing line, refusing to go over available stock
+        if not CartItem.add_quantity(cart, product_id, quantity, stock_quantity):
+            return Response({
+                'error': f'Only {stock_quantity} items available in stock.'
+            }, status=status.HTTP_400_BAD_REQUEST)
 
+        cart_item = CartItem.objects.select_related('product__category').get(
+            cart=cart, product_id=product_id)
         serializer = CartItemSerializer(cart_item)
         return Response({
             'message': 'Product added to cart successfully.',
@@ -293,24 +290,37 @@ def add_to_cart(request):
 @permission_classes([permissions.IsAuthenticated])
 def remove_from_cart(request, item_id):
     """Remove product from cart."""
-    try:
-        cart_item = CartItem.objects.get(
-            id=item_id,
-            cart__user=request.user
-        )
-        cart_item.delete()
-        return Response({'message': 'Product removed from cart successfully.'}, status=status.HTTP_200_OK)
-    except CartItem.DoesNotExist:
+    deleted, _ = CartItem.objects.filter(
+        id=item_id,
+        cart__user=request.user
+    ).delete()
+    if not deleted:
         return Response({'error': 'Cart item not found.'}, status=status.HTTP_404_NOT_FOUND)
 
+    return Response({'message': 'Product removed from cart successfully.'}, status=status.HTTP_200_OK)
 
-@api_view(['GET'])
-@permission_classes([permissions.IsAuthenticated])
+
+@require_GET
 def cart_count(request):
-    """Get cart item count."""
-    cart, created = Cart.objects.get_or_create(user=request.user)
-    count = cart.total_items
-    return Response({'count': count})
+    """Get cart item count, served without the DRF request/response stack."""
+    try:
+        authenticated = jwt_authentication.authenticate(request)
+        error = None if authenticated else NotAuthenticated()
+    except AuthenticationFailed as e:
+        error = e
+
+    if error is not None:
+        # Same body DRF's exception handler would render
+        data = error.detail
+        if not isinstance(data, dict):
+            data = {'detail': data}
+        response = JsonResponse(data, status=status.HTTP_401_UNAUTHORIZED)
+        response['WWW-Authenticate'] = jwt_authentication.authenticate_header(request)
+        return response
+
+    request.user = authenticated[0]
+    cart = get_user_cart(request)
+    return JsonResponse({'count': cart.total_items})
 
 
 @api_view(['POST'])
@@ -322,38 +332,9 @@ def merge_cart(request):
     if not guest_cart_data:
         return Response({'message': 'No guest cart data provided.'}, status=status.HTTP_200_OK)
 
-    cart, created = Cart.objects.get_or_create(user=request.user)
+    cart = get_user_cart(request)
 
     with transaction.atomic():
-        for item_data in guest_cart_data:
-            product_id = item_data.get('product_id')
-            quantity = item_data.get('quantity', 1)
-
-            try:
-                from products.models import Product
-                product = Product.objects.get(id=product_id, is_active=True)
-            except Product.DoesNotExist:
-                continue
-
-            # Check if item already exists in cart
-            existing_item = CartItem.objects.filter(
-                cart=cart,
-                product=product
-            ).first()
-
-            if existing_item:
-                # Update quantity
-                new_quantity = existing_item.quantity + quantity
-                if new_quantity <= product.stock_quantity:
-                    existing_item.quantity = new_quantity
-                    existing_item.save()
-            else:
-                # Create new item
-                if quantity <= product.stock_quantity:
-                    CartItem.objects.create(
-                        cart=cart,
-                        product=product,
-                        quantity=quantity
-                    )
+        CartItem.bulk_merge(cart, guest_cart_data)
 
     return Response({'message': 'Cart merged successfully.'}, status=status.HTTP_200_OK)
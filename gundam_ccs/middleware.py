@@ -2,8 +2,8 @@ import logging
 from django.http import JsonResponse
 from rest_framework import status
 from rest_framework_simplejwt.exceptions import TokenError, InvalidToken
-from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.utils.deprecation import MiddlewareMixin
+from accounts.authentication import jwt_authentication
 
 logger = logging.getLogger(__name__)
 
@@ -13,23 +13,37 @@ class APIHeadersMiddleware(MiddlewareMixin):
     Middleware to add API-specific headers for better cross-origin compatibility.
     """
     
+    # Security headers for API responses
+    API_HEADERS = (
+        ('X-Content-Type-Options', 'nosniff'),
+        ('X-Frame-Options', 'DENY'),
+    )
+
+    # Caching headers for API responses whose view set no policy of its own
+    NO_CACHE_HEADERS = (
+        ('Cache-Control', 'no-cache, no-store, must-revalidate'),
+        ('Pragma', 'no-cache'),
+        ('Expires', '0'),
+    )
+
     def process_response(self, request, response):
         """Add API headers to all responses."""
         # Add API version header
         response['X-API-Version'] = '1.0'
-        
-        # Add security headers for API responses
-        if request.path.startswith('/api/'):
-            response['X-Content-Type-Options'] = 'nosniff'
-            response['X-Frame-Options'] = 'DENY'
-            response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
-            response['Pragma'] = 'no-cache'
-            response['Expires'] = '0'
-            
-            # Add JSON content type for API responses if not set
-            if not response.get('Content-Type'):
-                response['Content-Type'] = 'application/json'
-        
+
+        if not request.path.startswith('/api/'):
+            return response
+
+        headers = self.API_HEADERS
+        if not response.has_header('Cache-Control'):
+            headers += self.NO_CACHE_HEADERS
+        for header, value in headers:
+            response[header] = value
+
+        # Add JSON content type for API responses if not set
+        if not response.has_header('Content-Type'):
+            response['Content-Type'] = 'application/json'
+
         return response
 
 
@@ -39,6 +53,28 @@ class JWTAuthenticationMiddleware(MiddlewareMixin):
     and prevent infinite loops from expired tokens.
     """
 
+    # Path prefixes that bypass token checks, matched in a single
+    # str.startswith call
+    SKIP_PATHS = (
+        '/admin/',
+        '/api/docs/',
+        '/api/redoc/',
+        '/api/health/',
+        '/api/cors-test/',
+        '/api/info/',
+        '/api/v1/accounts/login/',
+        '/api/v1/accounts/register/',
+        '/api/v1/accounts/token/refresh/',
+        '/api/v1/accounts/password-reset/',
+        '/api/v1/accounts/email-verify/',
+        '/api/v1/payments/pagomovil/info/',  # Allow anonymous access
+        '/api/v1/payments/pagomovil/banks/',  # Allow anonymous access
+        '/api/v1/payments/pagomovil/recipients/',  # Allow anonymous access
+        '/api/v1/payments/exchange-rate/',  # Allow anonymous access
+        '/media/',
+        '/static/',
+    )
+
     def process_request(self, request):
         """Process request and handle authentication errors."""
         # Skip middleware for certain paths
@@ -51,15 +87,12 @@ class JWTAuthenticationMiddleware(MiddlewareMixin):
             return None
 
         try:
-            # Try to authenticate the token
-            jwt_auth = JWTAuthentication()
-            validated_token = jwt_auth.get_validated_token(
-                jwt_auth.get_raw_token(request)
-            )
-            user = jwt_auth.get_user(validated_token)
+            # Try to authenticate the token; DRF reuses the result
+            authenticated = jwt_authentication.authenticate(request)
 
             # If we get here, token is valid
-            request.user = user
+            if authenticated is not None:
+                request.user = authenticated[0]
             return None
 
         except (TokenError, InvalidToken) as e:
@@ -82,23 +115,4 @@ class JWTAuthenticationMiddleware(MiddlewareMixin):
 
     def _should_skip_middleware(self, path):
         """Check if middleware should be skipped for this path."""
-        skip_paths = [
-            '/admin/',
-            '/api/docs/',
-            '/api/redoc/',
-            '/api/health/',
-            '/api/info/',
-            '/api/v1/accounts/login/',
-            '/api/v1/accounts/register/',
-            '/api/v1/accounts/token/refresh/',
-            '/api/v1/accounts/password-reset/',
-            '/api/v1/accounts/email-verify/',
-            '/api/v1/payments/pagomovil/info/',  # Allow anonymous access
-            '/api/v1/payments/pagomovil/banks/',  # Allow anonymous access
-            '/api/v1/payments/pagomovil/recipients/',  # Allow anonymous access
-            '/api/v1/payments/exchange-rate/',  # Allow anonymous access
-            '/media/',
-            '/static/',
-        ]
-
-        return any(path.startswith(skip_path) for skip_path in skip_paths)
+        return path.startswith(self.SKIP_PATHS)
@@ -0,0 +1,49 @@
+import json
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+_encoder = JSONEncoder()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson, falling back to DRF's encoder when
+    orjson is not installed or indented output is requested.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render `data` into JSON bytes."""
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        if data is None:
+            return b''
+
+        # DRF's encoder covers types orjson does not (Decimal, lazy strings,
+        # querysets, ...) so the output matches the stock renderer.
+        return orjson.dumps(
+            data,
+            default=_encoder.default,
+            option=orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS,
+        )
+
+
+def to_plain(data):
+    """
+    Convert serializer output (ReturnDict/OrderedDict trees) into plain
+    JSON-compatible dicts and lists, which pickle smaller and faster.
+    """
+    rendered = ORJSONRenderer().render(data)
+    if orjson is None:
+        return json.loads(rendered)
+    return orjson.loads(rendered)
@@ -0,0 +1,23 @@
+import copy
+from rest_framework.serializers import BaseSerializer
+
+
+class CachedFieldsMixin:
+    """
+    Build a ModelSerializer's fields once per class and hand each instance
+    copies, instead of re-running ModelSerializer introspection.
+    """
+
+    def get_fields(self):
+        """Return copies of the fields built on first use."""
+        cls = type(self)
+        cached = cls.__dict__.get('_fields_cache')
+        if cached is None:
+            cached = super().get_fields()
+            cls._fields_cache = cached
+        # Nested serializers are deep-copied so each copy binds its own child
+        return {
+            name: copy.deepcopy(field) if isinstance(field, BaseSerializer)
+            else copy.copy(field)
+            for name, field in cached.items()
+        }
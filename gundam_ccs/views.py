@@ -1,9 +1,48 @@
-from django.http import JsonResponse
+from django.http import HttpResponse
 from django.views import View
 from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import etag
+import hashlib
 import json
 
+from .renderers import ORJSONRenderer
+
+# Seconds clients and proxies may reuse a health check response
+HEALTH_CHECK_MAX_AGE = 60
+
+# Static OPTIONS payload, encoded once
+PREFLIGHT_BODY = b'{"cors_preflight": "success"}'
+
+# Request headers CORSTestView echoes back (lower-case prefixes)
+CORS_ECHO_HEADERS = (
+    'origin', 'access-control-', 'content-', 'accept', 'user-agent',
+    'referer', 'x-',
+)
+
+# Static part of the health check payload
+HEALTH_STATUS = {
+    'status': 'healthy',
+    'message': 'Gundam CCS API is running',
+    'version': '1.0',
+    'cors_enabled': True,
+}
+
+_renderer = ORJSONRenderer()
+
+
+def json_response(data, status=200):
+    """Build a JSON HttpResponse, encoded with orjson when available."""
+    return HttpResponse(_renderer.render(data),
+                        content_type='application/json', status=status)
+
+
+def health_check_etag(request):
+    """ETag for the health payload, which only varies by the echoed timestamp."""
+    timestamp = request.GET.get('timestamp', 'not_provided')
+    return hashlib.md5(f"{HEALTH_STATUS}:{timestamp}".encode()).hexdigest()
+
 
 @method_decorator(csrf_exempt, name='dispatch')
 class HealthCheckView(View):
@@ -11,13 +50,12 @@ class HealthCheckView(View):
     Simple health check endpoint to test CORS and API connectivity.
     """
     
+    @method_decorator(cache_control(public=True, max_age=HEALTH_CHECK_MAX_AGE))
+    @method_decorator(etag(health_check_etag))
     def get(self, request):
         """Return API health status."""
-        return JsonResponse({
-            'status': 'healthy',
-            'message': 'Gundam CCS API is running',
-            'version': '1.0',
-            'cors_enabled': True,
+        return json_response({
+            **HEALTH_STATUS,
             'timestamp': request.GET.get('timestamp', 'not_provided')
         })
     
@@ -27,16 +65,16 @@ class HealthCheckView(View):
             if request.content_type == 'application/json':
                 data = json.loads(request.body)
             else:
-                data = dict(request.POST)
+                data = dict(request.POST.lists())
             
-            return JsonResponse({
+            return json_response({
                 'status': 'success',
                 'message': 'POST request received',
                 'received_data': data,
                 'cors_enabled': True
             })
         except Exception as e:
-            return JsonResponse({
+            return json_response({
                 'status': 'error',
                 'message': str(e)
             }, status=400)
@@ -52,11 +90,14 @@ class CORSTestView(View):
         origin = request.META.get('HTTP_ORIGIN', 'no-origin')
         user_agent = request.META.get('HTTP_USER_AGENT', 'no-user-agent')
         
-        return JsonResponse({
+        return json_response({
             'cors_test': 'success',
             'origin': origin,
             'user_agent': user_agent,
-            'headers': dict(request.headers),
+            'headers': {
+                name: value for name, value in request.headers.items()
+                if name.lower().startswith(CORS_ECHO_HEADERS)
+            },
             'method': 'GET'
         })
     
@@ -64,7 +105,7 @@ class CORSTestView(View):
         """Test CORS POST request."""
         origin = request.META.get('HTTP_ORIGIN', 'no-origin')
         
-        return JsonResponse({
+        return json_response({
             'cors_test': 'success',
             'origin': origin,
             'method': 'POST',
@@ -73,5 +114,4 @@ class CORSTestView(View):
     
     def options(self, request):
         """Handle CORS preflight requests."""
-        response = JsonResponse({'cors_preflight': 'success'})
-        return response
+        return HttpResponse(PREFLIGHT_BODY, content_type='application/json')
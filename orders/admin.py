@@ -28,17 +28,22 @@ class OrderAdmin(admin.ModelAdmin):
 
     list_display = ('order_number', 'user', 'status', 'payment_status',
                     'total_amount', 'total_items', 'created_at')
-    list_filter = ('status', 'payment_status', 'created_at')
-    search_fields = ('order_number', 'user__email', 'payment_intent_id')
-    ordering = ('-created_at',)
+    list_filter = ('status', 'payment_status', 'shipping_country', 'created_at')
+    # Order numbers and payment intents are searched by prefix; the email
+    # substring search is backed by a trigram index on PostgreSQL
+    search_fields = ('^order_number', 'user__email', '^payment_intent_id')
+    # Total ordering, so the changelist doesn't append its own -pk tiebreak
+    ordering = ('-created_at', '-id')
+    list_select_related = ('user',)
 
     fieldsets = (
         ('Order Info', {'fields': ('order_number',
          'user', 'status', 'payment_status')}),
         ('Pricing', {'fields': ('subtotal', 'tax_amount',
          'shipping_amount', 'discount_amount', 'total_amount')}),
-        ('Shipping', {'fields': ('shipping_address',
-         'billing_address', 'tracking_number', 'tracking_url')}),
+        ('Shipping', {'fields': ('shipping_address', 'shipping_country',
+         'shipping_state', 'shipping_postal_code', 'billing_address',
+         'tracking_number', 'tracking_url')}),
         ('Payment', {'fields': ('payment_intent_id',
          'payment_method', 'applied_coupon')}),
         ('Timestamps', {'fields': ('shipped_at',
@@ -47,17 +52,28 @@ class OrderAdmin(admin.ModelAdmin):
     )
 
     readonly_fields = ('order_number', 'subtotal', 'tax_amount', 'shipping_amount',
-                       'discount_amount', 'total_amount', 'total_items', 'created_at', 'updated_at')
+                       'discount_amount', 'total_amount', 'total_items', 'shipping_country',
+                       'shipping_state', 'shipping_postal_code', 'created_at', 'updated_at')
     inlines = [OrderItemInline, OrderStatusHistoryInline]
+    actions = ['bulk_confirm']
 
     def total_items(self, obj):
         """Display total items in order."""
         return obj.total_items
     total_items.short_description = 'Items'
+    total_items.admin_order_field = '_total_items'
 
     def get_queryset(self, request):
-        """Optimize queryset with related fields."""
-        return super().get_queryset(request).select_related('user', 'applied_coupon')
+        """Annotate item counts so the changelist doesn't query per row."""
+        return super().get_queryset(request).with_totals()
+
+    def bulk_confirm(self, request, queryset):
+        """Confirm selected pending orders."""
+        confirmed = queryset.transition_to(
+            Order.Status.CONFIRMED, notes='Confirmed via admin')
+        self.message_user(
+            request, f'Successfully confirmed {confirmed} orders.')
+    bulk_confirm.short_description = "Confirm selected pending orders"
 
 
 @admin.register(OrderItem)
@@ -70,6 +86,8 @@ class OrderItemAdmin(admin.ModelAdmin):
     search_fields = ('order__order_number', 'product__name',
                      'product_name', 'product_sku')
     ordering = ('-order__created_at',)
+    # Order.__str__ reads the user's email
+    list_select_related = ('order__user', 'product')
 
     fieldsets = (
         ('Order & Product', {'fields': ('order', 'product')}),
@@ -80,10 +98,6 @@ class OrderItemAdmin(admin.ModelAdmin):
 
     readonly_fields = ('product_name', 'product_sku', 'total_price')
 
-    def get_queryset(self, request):
-        """Optimize queryset with related fields."""
-        return super().get_queryset(request).select_related('order', 'product')
-
 
 @admin.register(OrderStatusHistory)
 class OrderStatusHistoryAdmin(admin.ModelAdmin):
@@ -93,6 +107,7 @@ class OrderStatusHistoryAdmin(admin.ModelAdmin):
     list_filter = ('status', 'created_at')
     search_fields = ('order__order_number', 'notes')
     ordering = ('-created_at',)
+    list_select_related = ('order__user',)
 
     fieldsets = (
         ('Order', {'fields': ('order',)}),
@@ -102,10 +117,6 @@ class OrderStatusHistoryAdmin(admin.ModelAdmin):
 
     readonly_fields = ('created_at',)
 
-    def get_queryset(self, request):
-        """Optimize queryset with related fields."""
-        return super().get_queryset(request).select_related('order')
-
 
 @admin.register(ShippingMethod)
 class ShippingMethodAdmin(admin.ModelAdmin):
@@ -148,5 +159,5 @@ class TaxRateAdmin(admin.ModelAdmin):
 
     def rate_display(self, obj):
         """Display rate as percentage."""
-        return f"{obj.rate * 100}%"
+        return f"{obj.rate_percentage}%"
     rate_display.short_description = 'Rate'
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-15 23:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['status', 'payment_status', '-created_at'], name='orders_orde_status_2f7f86_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', '-created_at'], name='orders_orde_user_id_0ae59f_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['payment_intent_id'], name='orders_orde_payment_965889_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taxrate',
+            index=models.Index(fields=['country', 'state', 'is_active'], name='orders_taxr_country_fe940d_idx'),
+        ),
+    ]
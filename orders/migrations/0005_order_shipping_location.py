@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-15 23:03
+
+from django.db import migrations, models
+
+# shipping_address key -> (column, max_length), as in Order.sync_shipping_location
+SHIPPING_LOCATION_FIELDS = {
+    'country': ('shipping_country', 100),
+    'state': ('shipping_state', 100),
+    'postal_code': ('shipping_postal_code', 20),
+}
+
+
+def backfill_shipping_location(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    orders = []
+    for order in Order.objects.only('id', 'shipping_address').iterator():
+        address = order.shipping_address if isinstance(
+            order.shipping_address, dict) else {}
+        for key, (field, max_length) in SHIPPING_LOCATION_FIELDS.items():
+            setattr(order, field, str(address.get(key) or '')[:max_length])
+        orders.append(order)
+    Order.objects.bulk_update(
+        orders, [field for field, _ in SHIPPING_LOCATION_FIELDS.values()],
+        batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='shipping_country',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='shipping_postal_code',
+            field=models.CharField(blank=True, editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='shipping_state',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['shipping_country', 'shipping_state'], name='orders_orde_shippin_2f4bcc_idx'),
+        ),
+        migrations.RunPython(backfill_shipping_location, migrations.RunPython.noop),
+    ]
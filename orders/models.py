@@ -1,39 +1,120 @@
-from django.db import models
+import secrets
+import string
+from types import MappingProxyType
+from django.db import IntegrityError, models, transaction
+from django.db.models import Prefetch, Sum, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
 from products.models import Product
 from cart.models import CartCoupon
 
 User = get_user_model()
 
+ORDER_NUMBER_ALPHABET = string.ascii_uppercase + string.digits
+# Fresh numbers tried before an insert's IntegrityError is re-raised
+ORDER_NUMBER_ATTEMPTS = 3
+
+# shipping_address keys mirrored onto Order columns
+SHIPPING_LOCATION_FIELDS = {
+    'country': 'shipping_country',
+    'state': 'shipping_state',
+    'postal_code': 'shipping_postal_code',
+}
+
+
+# Order columns read by OrderListSerializer and OrderSummarySerializer
+ORDER_LIST_FIELDS = ('id', 'user_id', 'order_number', 'status', 'payment_status',
+                     'total_amount', 'created_at')
+
+# Order columns read when checking and recording a status change
+ORDER_STATUS_FIELDS = ('id', 'user_id', 'order_number', 'status', 'payment_status')
+
+# Order columns read by OrderTrackingSerializer
+ORDER_TRACKING_FIELDS = ('id', 'user_id', 'order_number', 'status', 'tracking_number',
+                         'tracking_url', 'shipped_at', 'delivered_at')
+
+
+class OrderQuerySet(models.QuerySet):
+    """QuerySet helpers for orders."""
+
+    def with_details(self):
+        """Load items with their products and images, and status history, up front."""
+        return self.select_related('user', 'applied_coupon').prefetch_related(
+            Prefetch('items', queryset=OrderItem.objects.select_related(
+                'product__category')),
+            'items__product__images',
+            'status_history',
+        )
+
+    def for_listing(self):
+        """Load only the columns list and summary serializers read, with item counts."""
+        return self.only(*ORDER_LIST_FIELDS).with_totals()
+
+    def transition_to(self, status, notes=''):
+        """
+        Move the orders that may reach `status` from their current one,
+        recording their history rows in one INSERT. Returns how many moved.
+        """
+        sources = [source for source, targets in ALLOWED_STATUS_TRANSITIONS.items()
+                   if status in targets]
+        now = timezone.now()
+        changes = {'status': status, 'updated_at': now}
+        if status in STATUS_TIMESTAMP_FIELDS:
+            changes[STATUS_TIMESTAMP_FIELDS[status]] = now
+
+        with transaction.atomic():
+            order_ids = list(Order.objects.select_for_update().filter(
+                pk__in=self.values('pk'), status__in=sources
+            ).values_list('pk', flat=True))
+            if not order_ids:
+                return 0
+            Order.objects.filter(pk__in=order_ids).update(**changes)
+            OrderStatusHistory.objects.bulk_create(
+                [OrderStatusHistory(order_id=order_id, status=status, notes=notes)
+                 for order_id in order_ids],
+                batch_size=500)
+        return len(order_ids)
+
+    def with_totals(self):
+        """Annotate each order with its item count in the same query."""
+        return self.annotate(
+            _total_items=Coalesce(Sum('items__quantity'), Value(0)))
+
 
 class Order(models.Model):
     """Customer orders."""
 
-    STATUS_CHOICES = [
-        ('pending', 'Pending'),
-        ('confirmed', 'Confirmed'),
-        ('processing', 'Processing'),
-        ('shipped', 'Shipped'),
-        ('delivered', 'Delivered'),
-        ('cancelled', 'Cancelled'),
-        ('refunded', 'Refunded'),
-    ]
-
-    PAYMENT_STATUS_CHOICES = [
-        ('pending', 'Pending'),
-        ('paid', 'Paid'),
-        ('failed', 'Failed'),
-        ('refunded', 'Refunded'),
-        ('partially_refunded', 'Partially Refunded'),
-    ]
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        CONFIRMED = 'confirmed', 'Confirmed'
+        PROCESSING = 'processing', 'Processing'
+        SHIPPED = 'shipped', 'Shipped'
+        DELIVERED = 'delivered', 'Delivered'
+        CANCELLED = 'cancelled', 'Cancelled'
+        REFUNDED = 'refunded', 'Refunded'
+
+    class PaymentStatus(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        PAID = 'paid', 'Paid'
+        FAILED = 'failed', 'Failed'
+        REFUNDED = 'refunded', 'Refunded'
+        PARTIALLY_REFUNDED = 'partially_refunded', 'Partially Refunded'
+
+    STATUS_CHOICES = Status.choices
+    PAYMENT_STATUS_CHOICES = PaymentStatus.choices
+
+    # Statuses from which the customer may still cancel
+    CANCELLABLE_STATUSES = frozenset({Status.PENDING, Status.CONFIRMED})
 
     user = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='orders')
     order_number = models.CharField(max_length=20, unique=True)
     status = models.CharField(
-        max_length=20, choices=STATUS_CHOICES, default='pending')
+        max_length=20, choices=Status.choices, default=Status.PENDING)
     payment_status = models.CharField(
-        max_length=20, choices=PAYMENT_STATUS_CHOICES, default='pending')
+        max_length=20, choices=PaymentStatus.choices, default=PaymentStatus.PENDING)
 
     # Pricing
     subtotal = models.DecimalField(max_digits=10, decimal_places=2)
@@ -48,6 +129,10 @@ class Order(models.Model):
     # Shipping information
     shipping_address = models.JSONField()
     billing_address = models.JSONField(blank=True, null=True)
+    # Copied from shipping_address on save, for filtering and tax matching
+    shipping_country = models.CharField(max_length=100, blank=True, editable=False)
+    shipping_state = models.CharField(max_length=100, blank=True, editable=False)
+    shipping_postal_code = models.CharField(max_length=20, blank=True, editable=False)
 
     # Payment information
     payment_intent_id = models.CharField(max_length=255, blank=True)
@@ -70,30 +155,51 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = OrderQuerySet.as_manager()
+
     def save(self, *args, **kwargs):
-        if not self.order_number:
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            # A save with the address deferred only writes loaded columns
+            if 'shipping_address' not in self.get_deferred_fields():
+                self.sync_shipping_location()
+        elif 'shipping_address' in update_fields:
+            self.sync_shipping_location()
+            kwargs['update_fields'] = {
+                *update_fields, *SHIPPING_LOCATION_FIELDS.values()}
+
+        if self.order_number:
+            super().save(*args, **kwargs)
+            return
+
+        # The random part makes collisions rare enough to skip the lookup;
+        # the unique index catches the odd one and a fresh number is drawn
+        for attempt in range(ORDER_NUMBER_ATTEMPTS):
             self.order_number = self.generate_order_number()
-        super().save(*args, **kwargs)
+            try:
+                with transaction.atomic():
+                    super().save(*args, **kwargs)
+                return
+            except IntegrityError:
+                if attempt == ORDER_NUMBER_ATTEMPTS - 1:
+                    self.order_number = ''
+                    raise
+
+    def sync_shipping_location(self):
+        """Copy the location keys of shipping_address onto their columns."""
+        address = self.shipping_address if isinstance(
+            self.shipping_address, dict) else {}
+        for key, field in SHIPPING_LOCATION_FIELDS.items():
+            max_length = self._meta.get_field(field).max_length
+            setattr(self, field, str(address.get(key) or '')[:max_length])
 
     def generate_order_number(self):
-        """Generate a unique order number."""
-        import random
-        import string
-        from django.utils import timezone
-
-        # Format: GUN-YYYYMMDD-XXXXX
+        """Generate a random order number, unique with overwhelming probability."""
+        # Format: GUN-YYYYMMDD-XXXXXXX
         date_str = timezone.now().strftime('%Y%m%d')
-        random_str = ''.join(random.choices(
-            string.ascii_uppercase + string.digits, k=5))
-        order_number = f"GUN-{date_str}-{random_str}"
-
-        # Ensure uniqueness
-        while Order.objects.filter(order_number=order_number).exists():
-            random_str = ''.join(random.choices(
-                string.ascii_uppercase + string.digits, k=5))
-            order_number = f"GUN-{date_str}-{random_str}"
-
-        return order_number
+        random_str = ''.join(
+            secrets.choice(ORDER_NUMBER_ALPHABET) for _ in range(7))
+        return f"GUN-{date_str}-{random_str}"
 
     def __str__(self):
         return f"Order {self.order_number} - {self.user.email}"
@@ -101,17 +207,23 @@ class Order(models.Model):
     @property
     def total_items(self):
         """Get total number of items in order."""
-        return sum(item.quantity for item in self.items.all())
+        # Set by OrderQuerySet.with_totals()
+        if hasattr(self, '_total_items'):
+            return self._total_items
+        prefetched = getattr(self, '_prefetched_objects_cache', {})
+        if 'items' in prefetched:
+            return sum(item.quantity for item in prefetched['items'])
+        return self.items.aggregate(total=Sum('quantity'))['total'] or 0
 
     def can_cancel(self):
         """Check if order can be cancelled."""
-        return self.status in ['pending', 'confirmed']
+        return self.status in self.CANCELLABLE_STATUSES
 
     def cancel(self):
         """Cancel the order."""
         if self.can_cancel():
-            self.status = 'cancelled'
-            self.save()
+            self.status = self.Status.CANCELLED
+            self.save(update_fields=['status', 'updated_at'])
             return True
         return False
 
@@ -119,6 +231,31 @@ class Order(models.Model):
         verbose_name = 'Order'
         verbose_name_plural = 'Orders'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'payment_status', '-created_at']),
+            models.Index(fields=['user', '-created_at']),
+            models.Index(fields=['payment_intent_id']),
+            models.Index(fields=['-created_at', '-id']),
+            models.Index(fields=['shipping_country', 'shipping_state']),
+        ]
+
+
+# Statuses an order may move to from each status
+ALLOWED_STATUS_TRANSITIONS = MappingProxyType({
+    Order.Status.PENDING: frozenset({Order.Status.CONFIRMED, Order.Status.CANCELLED}),
+    Order.Status.CONFIRMED: frozenset({Order.Status.PROCESSING, Order.Status.CANCELLED}),
+    Order.Status.PROCESSING: frozenset({Order.Status.SHIPPED, Order.Status.CANCELLED}),
+    Order.Status.SHIPPED: frozenset({Order.Status.DELIVERED}),
+    Order.Status.DELIVERED: frozenset(),
+    Order.Status.CANCELLED: frozenset(),
+    Order.Status.REFUNDED: frozenset(),
+})
+
+# Order timestamp set when an order reaches the status
+STATUS_TIMESTAMP_FIELDS = {
+    Order.Status.SHIPPED: 'shipped_at',
+    Order.Status.DELIVERED: 'delivered_at',
+}
 
 
 class OrderItem(models.Model):
@@ -140,13 +277,38 @@ class OrderItem(models.Model):
             self.product_name = self.product.name
         if not self.product_sku:
             self.product_sku = self.product.sku
-        if not self.total_price:
-            self.total_price = self.unit_price * self.quantity
+        # Kept in step with its operands, not just filled in once
+        self.total_price = self.unit_price * self.quantity
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'quantity', 'unit_price'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'total_price'}
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.quantity}x {self.product_name} in {self.order}"
 
+    @classmethod
+    def bulk_create_from_cart(cls, order, cart_items):
+        """
+        Snapshot cart items onto `order` in one INSERT. Fills the fields
+        save() would otherwise derive per row; cart items should come with
+        their product already selected.
+        """
+        rows = []
+        for cart_item in cart_items:
+            product = cart_item.product
+            unit_price = product.current_price
+            rows.append(cls(
+                order=order,
+                product=product,
+                product_name=product.name,
+                product_sku=product.sku,
+                quantity=cart_item.quantity,
+                unit_price=unit_price,
+                total_price=unit_price * cart_item.quantity,
+            ))
+        return cls.objects.bulk_create(rows, batch_size=500)
+
     class Meta:
         verbose_name = 'Order Item'
         verbose_name_plural = 'Order Items'
@@ -157,7 +319,7 @@ class OrderStatusHistory(models.Model):
 
     order = models.ForeignKey(
         Order, on_delete=models.CASCADE, related_name='status_history')
-    status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    status = models.CharField(max_length=20, choices=Order.Status.choices)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -204,9 +366,65 @@ class TaxRate(models.Model):
 
     def __str__(self):
         location = f"{self.city}, {self.state}" if self.city and self.state else self.state or self.country
-        return f"{location} - {self.rate * 100}%"
+        return f"{location} - {self.rate_percentage}%"
+
+    @property
+    def rate_percentage(self):
+        """Get rate as percentage."""
+        return self.rate * 100
 
     class Meta:
         verbose_name = 'Tax Rate'
         verbose_name_plural = 'Tax Rates'
         unique_together = ['country', 'state', 'city', 'postal_code']
+        indexes = [
+            models.Index(fields=['country', 'state', 'is_active']),
+        ]
+
+
+REFERENCE_CACHE_TIMEOUT = 300  # 5 minutes
+SHIPPING_METHODS_CACHE_KEY = 'orders:shipping_methods'
+TAX_RATES_CACHE_KEY = 'orders:tax_rates'
+
+
+def get_active_shipping_methods():
+    """Return active shipping methods as {id: ShippingMethod}, read through the cache."""
+    methods = cache.get(SHIPPING_METHODS_CACHE_KEY)
+    if methods is None:
+        methods = {method.id: method
+                   for method in ShippingMethod.objects.filter(is_active=True)}
+        cache.set(SHIPPING_METHODS_CACHE_KEY, methods, REFERENCE_CACHE_TIMEOUT)
+    return methods
+
+
+def get_active_shipping_method(method_id):
+    """Return the active shipping method with `method_id` (int or str), or None."""
+    try:
+        return get_active_shipping_methods().get(int(method_id))
+    except (TypeError, ValueError):
+        return None
+
+
+def get_active_tax_rates():
+    """Return the list of active tax rates, read through the cache."""
+    rates = cache.get(TAX_RATES_CACHE_KEY)
+    if rates is None:
+        rates = list(TaxRate.objects.filter(is_active=True).order_by('pk'))
+        cache.set(TAX_RATES_CACHE_KEY, rates, REFERENCE_CACHE_TIMEOUT)
+    return rates
+
+
+def find_tax_rate(country, state='', city='', postal_code=''):
+    """
+    Return the active tax rate for an exact address match, else the first
+    one for the country, else None.
+    """
+    fallback = None
+    for rate in get_active_tax_rates():
+        if rate.country != country:
+            continue
+        if (rate.state, rate.city, rate.postal_code) == (state, city, postal_code):
+            return rate
+        if fallback is None:
+            fallback = rate
+    return fallback
@@ -1,17 +1,35 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from gundam_ccs.serializers import CachedFieldsMixin
 from products.serializers import ProductListSerializer
 from cart.serializers import CartCouponSerializer
-from .models import Order, OrderItem, OrderStatusHistory, ShippingMethod, TaxRate
+from .models import (
+    Order, OrderItem, OrderStatusHistory, ShippingMethod, TaxRate,
+    ALLOWED_STATUS_TRANSITIONS, get_active_shipping_method
+)
 
 User = get_user_model()
 
+# Standalone field used to format timestamps the way DRF's DateTimeField does
+DATETIME_FIELD = serializers.DateTimeField()
+
+# Address keys each serializer requires, in the order errors are reported
+ORDER_ADDRESS_FIELDS = ('name', 'line1', 'city', 'state', 'postal_code', 'country')
+CHECKOUT_ADDRESS_FIELDS = ('first_name', 'last_name', 'address_line_1',
+                           'city', 'state', 'postal_code', 'country', 'phone')
+
+
+def missing_address_fields(address, required_fields):
+    """Return the required fields that are absent or empty in `address`."""
+    present = {key for key, val in address.items() if val}
+    missing = set(required_fields) - present
+    return [field for field in required_fields if field in missing]
+
 
 class OrderItemSerializer(serializers.ModelSerializer):
     """Serializer for order items."""
 
     product = ProductListSerializer(read_only=True)
-    total_price = serializers.SerializerMethodField()
 
     class Meta:
         model = OrderItem
@@ -19,10 +37,6 @@ class OrderItemSerializer(serializers.ModelSerializer):
                   'quantity', 'unit_price', 'total_price')
         read_only_fields = ('id', 'product_name', 'product_sku', 'total_price')
 
-    def get_total_price(self, obj):
-        """Calculate total price for this item."""
-        return obj.total_price
-
 
 class OrderStatusHistorySerializer(serializers.ModelSerializer):
     """Serializer for order status history."""
@@ -30,7 +44,7 @@ class OrderStatusHistorySerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderStatusHistory
         fields = ('id', 'status', 'notes', 'created_at')
-        read_only_fields = ('id', 'created_at')
+        read_only_fields = fields
 
 
 class ShippingMethodSerializer(serializers.ModelSerializer):
@@ -40,43 +54,50 @@ class ShippingMethodSerializer(serializers.ModelSerializer):
         model = ShippingMethod
         fields = ('id', 'name', 'description', 'price',
                   'estimated_days', 'is_active')
-        read_only_fields = ('id',)
+        read_only_fields = fields
 
 
 class TaxRateSerializer(serializers.ModelSerializer):
     """Serializer for tax rates."""
 
-    rate_percentage = serializers.SerializerMethodField()
+    rate_percentage = serializers.ReadOnlyField()
 
     class Meta:
         model = TaxRate
         fields = ('id', 'country', 'state', 'city', 'postal_code',
                   'rate', 'rate_percentage', 'is_active')
-        read_only_fields = ('id',)
-
-    def get_rate_percentage(self, obj):
-        """Get rate as percentage."""
-        return obj.rate * 100
+        read_only_fields = fields
 
 
 class OrderListSerializer(serializers.ModelSerializer):
     """Serializer for listing orders."""
 
-    total_items = serializers.SerializerMethodField()
+    # Declared for schema generation; to_representation fills it in
+    total_items = serializers.IntegerField(read_only=True)
 
     class Meta:
         model = Order
         fields = ('id', 'order_number', 'status', 'payment_status',
                   'total_amount', 'total_items', 'created_at')
-        read_only_fields = ('id', 'order_number',
-                            'total_amount', 'total_items', 'created_at')
-
-    def get_total_items(self, obj):
-        """Get total number of items in order."""
-        return obj.total_items
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        """
+        Build the row directly; list endpoints render many of these and the
+        per-field machinery dominates. Output matches the declared fields.
+        """
+        return {
+            'id': instance.id,
+            'order_number': instance.order_number,
+            'status': instance.status,
+            'payment_status': instance.payment_status,
+            'total_amount': f'{instance.total_amount:.2f}',
+            'total_items': instance.total_items,
+            'created_at': DATETIME_FIELD.to_representation(instance.created_at),
+        }
 
 
-class OrderDetailSerializer(serializers.ModelSerializer):
+class OrderDetailSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for order details."""
 
     items = OrderItemSerializer(many=True, read_only=True)
@@ -91,8 +112,7 @@ class OrderDetailSerializer(serializers.ModelSerializer):
                   'billing_address', 'payment_intent_id', 'payment_method', 'applied_coupon',
                   'tracking_number', 'tracking_url', 'shipped_at', 'delivered_at', 'customer_notes',
                   'admin_notes', 'items', 'status_history', 'total_items', 'created_at', 'updated_at')
-        read_only_fields = ('id', 'order_number', 'subtotal', 'tax_amount', 'shipping_amount',
-                            'discount_amount', 'total_amount', 'total_items', 'created_at', 'updated_at')
+        read_only_fields = fields
 
     def get_total_items(self, obj):
         """Get total number of items in order."""
@@ -114,23 +134,19 @@ class OrderCreateSerializer(serializers.ModelSerializer):
 
     def validate_shipping_address(self, value):
         """Validate shipping address."""
-        required_fields = ['name', 'line1', 'city',
-                           'state', 'postal_code', 'country']
-        for field in required_fields:
-            if not value.get(field):
-                raise serializers.ValidationError(
-                    f"Shipping address {field} is required.")
+        missing = missing_address_fields(value, ORDER_ADDRESS_FIELDS)
+        if missing:
+            raise serializers.ValidationError(
+                [f"Shipping address {field} is required." for field in missing])
         return value
 
     def validate_billing_address(self, value):
         """Validate billing address if provided."""
         if value:
-            required_fields = ['name', 'line1', 'city',
-                               'state', 'postal_code', 'country']
-            for field in required_fields:
-                if not value.get(field):
-                    raise serializers.ValidationError(
-                        f"Billing address {field} is required.")
+            missing = missing_address_fields(value, ORDER_ADDRESS_FIELDS)
+            if missing:
+                raise serializers.ValidationError(
+                    [f"Billing address {field} is required." for field in missing])
         return value
 
 
@@ -173,23 +189,19 @@ class OrderStatusUpdateSerializer(serializers.ModelSerializer):
         order = self.instance
         current_status = order.status
 
-        # Define allowed status transitions
-        allowed_transitions = {
-            'pending': ['confirmed', 'cancelled'],
-            'confirmed': ['processing', 'cancelled'],
-            'processing': ['shipped', 'cancelled'],
-            'shipped': ['delivered'],
-            'delivered': [],
-            'cancelled': [],
-            'refunded': [],
-        }
-
-        if value not in allowed_transitions.get(current_status, []):
+        if value not in ALLOWED_STATUS_TRANSITIONS.get(current_status, frozenset()):
             raise serializers.ValidationError(
                 f'Cannot change status from {current_status} to {value}.')
 
         return value
 
+    def update(self, instance, validated_data):
+        """Write only the changed columns, in a single UPDATE."""
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+
 
 class OrderTrackingSerializer(serializers.ModelSerializer):
     """Serializer for order tracking information."""
@@ -198,11 +210,10 @@ class OrderTrackingSerializer(serializers.ModelSerializer):
         model = Order
         fields = ('order_number', 'status', 'tracking_number',
                   'tracking_url', 'shipped_at', 'delivered_at')
-        read_only_fields = ('order_number', 'status',
-                            'shipped_at', 'delivered_at')
+        read_only_fields = fields
 
 
-class OrderSummarySerializer(serializers.ModelSerializer):
+class OrderSummarySerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for order summary."""
 
     total_items = serializers.SerializerMethodField()
@@ -211,8 +222,7 @@ class OrderSummarySerializer(serializers.ModelSerializer):
         model = Order
         fields = ('order_number', 'status', 'total_amount',
                   'total_items', 'created_at')
-        read_only_fields = ('order_number', 'total_amount',
-                            'total_items', 'created_at')
+        read_only_fields = fields
 
     def get_total_items(self, obj):
         """Get total number of items in order."""
@@ -230,30 +240,23 @@ class CheckoutSerializer(serializers.Serializer):
 
     def validate_shipping_address(self, value):
         """Validate shipping address."""
-        required_fields = ['first_name', 'last_name', 'address_line_1',
-                           'city', 'state', 'postal_code', 'country', 'phone']
-        for field in required_fields:
-            if not value.get(field):
-                raise serializers.ValidationError(
-                    f'{field.replace("_", " ").title()} is required.')
+        missing = missing_address_fields(value, CHECKOUT_ADDRESS_FIELDS)
+        if missing:
+            raise serializers.ValidationError(
+                [f'{field.replace("_", " ").title()} is required.' for field in missing])
         return value
 
     def validate_billing_address(self, value):
         """Validate billing address."""
         if value:
-            required_fields = ['first_name', 'last_name', 'address_line_1',
-                               'city', 'state', 'postal_code', 'country', 'phone']
-            for field in required_fields:
-                if not value.get(field):
-                    raise serializers.ValidationError(
-                        f'{field.replace("_", " ").title()} is required.')
+            missing = missing_address_fields(value, CHECKOUT_ADDRESS_FIELDS)
+            if missing:
+                raise serializers.ValidationError(
+                    [f'{field.replace("_", " ").title()} is required.' for field in missing])
         return value
 
     def validate_shipping_method_id(self, value):
         """Validate shipping method."""
-        try:
-            shipping_method = ShippingMethod.objects.get(
-                id=value, is_active=True)
-        except ShippingMethod.DoesNotExist:
+        if get_active_shipping_method(value) is None:
             raise serializers.ValidationError('Invalid shipping method.')
         return value
@@ -0,0 +1,21 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import (
+    ShippingMethod, TaxRate, SHIPPING_METHODS_CACHE_KEY, TAX_RATES_CACHE_KEY
+)
+
+
+@receiver(post_save, sender=ShippingMethod)
+@receiver(post_delete, sender=ShippingMethod)
+def shipping_method_changed(sender, **kwargs):
+    """Drop the cached active shipping methods."""
+    cache.delete(SHIPPING_METHODS_CACHE_KEY)
+
+
+@receiver(post_save, sender=TaxRate)
+@receiver(post_delete, sender=TaxRate)
+def tax_rate_changed(sender, **kwargs):
+    """Drop the cached active tax rates."""
+    cache.delete(TAX_RATES_CACHE_KEY)
@@ -1,3 +1,136 @@
-from django.test import TestCase
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from cart.models import Cart, CartCoupon, CartItem
+from products.models import Category, Product
+from .models import ALLOWED_STATUS_TRANSITIONS, Order, OrderStatusHistory
+
+User = get_user_model()
+
+# The project falls back to a database cache whose table tests don't create
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+SHIPPING_ADDRESS = {
+    'name': 'Amuro Ray', 'line1': '1 White Base', 'city': 'Side 7',
+    'state': 'S7', 'postal_code': '00079', 'country': 'US',
+}
+
+
+class TransitionToTest(TestCase):
+    """Bulk status transitions follow ALLOWED_STATUS_TRANSITIONS."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            email='char@example.com', username='char', password='x')
+
+    def make_orders(self):
+        """One order in every status, keyed by status."""
+        return {
+            status: Order.objects.create(
+                user=self.user, status=status, subtotal=Decimal('10.00'),
+                total_amount=Decimal('10.00'), shipping_address=SHIPPING_ADDRESS)
+            for status in Order.Status
+        }
+
+    def test_only_allowed_sources_move(self):
+        for target in Order.Status:
+            with self.subTest(target=target):
+                orders = self.make_orders()
+                pks = [order.pk for order in orders.values()]
+                moved = Order.objects.filter(pk__in=pks).transition_to(
+                    target, notes='bulk')
+
+                allowed = {source for source, targets in ALLOWED_STATUS_TRANSITIONS.items()
+                           if target in targets}
+                self.assertEqual(moved, len(allowed))
+                for source, order in orders.items():
+                    order.refresh_from_db()
+                    expected = target if source in allowed else source
+                    self.assertEqual(order.status, expected)
+                    self.assertEqual(
+                        order.status_history.filter(status=target, notes='bulk').exists(),
+                        source in allowed)
+                Order.objects.filter(pk__in=pks).delete()
+
+    def test_sets_status_timestamp(self):
+        order = Order.objects.create(
+            user=self.user, status=Order.Status.PROCESSING,
+            subtotal=Decimal('10.00'), total_amount=Decimal('10.00'),
+            shipping_address=SHIPPING_ADDRESS)
+        Order.objects.filter(pk=order.pk).transition_to(Order.Status.SHIPPED)
+        order.refresh_from_db()
+        self.assertIsNotNone(order.shipped_at)
+        self.assertIsNone(order.delivered_at)
+
+    def test_nothing_to_move(self):
+        order = Order.objects.create(
+            user=self.user, status=Order.Status.DELIVERED,
+            subtotal=Decimal('10.00'), total_amount=Decimal('10.00'),
+            shipping_address=SHIPPING_ADDRESS)
+        moved = Order.objects.filter(pk=order.pk).transition_to(
+            Order.Status.CANCELLED)
+        self.assertEqual(moved, 0)
+        self.assertFalse(OrderStatusHistory.objects.filter(order=order).exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class OrderCreateCouponTest(TestCase):
+    """Coupon usage limits hold when creating orders."""
+
+    @classmethod
+    def setUpTestData(cls):
+        category = Category.objects.create(name='Perfect Grade')
+        cls.kit = Product.objects.create(
+            name='PG Unicorn', description='Kit', category=category,
+            sku='PG-1', price=Decimal('100.00'), stock_quantity=10)
+        now = timezone.now()
+        cls.coupon = CartCoupon.objects.create(
+            code='ONCE', name='Once', coupon_type='percentage',
+            value=Decimal('10'), usage_limit=1,
+            valid_from=now - timezone.timedelta(days=1),
+            valid_until=now + timezone.timedelta(days=1))
+
+    def setUp(self):
+        cache.clear()
+
+    def create_order(self, name):
+        user = User.objects.create_user(
+            email=f'{name}@example.com', username=name, password='x')
+        cart = Cart.objects.create(user=user)
+        CartItem.objects.create(cart=cart, product=self.kit, quantity=1)
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.post('/api/v1/orders/orders/create/', {
+            'shipping_address': SHIPPING_ADDRESS, 'coupon_code': 'once',
+        }, format='json')
+        self.assertEqual(response.status_code, 201)
+        return response.json()['order']
+
+    def test_usage_limit(self):
+        order = self.create_order('first')
+        self.assertEqual(Decimal(order['subtotal']), Decimal('100.00'))
+        self.assertEqual(Decimal(order['discount_amount']), Decimal('10.00'))
+        self.assertEqual(order['applied_coupon']['code'], 'ONCE')
+
+        # The cached coupon still shows no uses; the SQL claim refuses it
+        order = self.create_order('second')
+        self.assertEqual(Decimal(order['discount_amount']), Decimal('0'))
+        self.assertIsNone(order['applied_coupon'])
+
+        self.coupon.refresh_from_db()
+        self.assertEqual(self.coupon.used_count, 1)
+
+    def test_deactivated_coupon(self):
+        self.create_order('first')
+        # A queryset update skips the cache invalidation; the SQL claim still sees it
+        CartCoupon.objects.filter(pk=self.coupon.pk).update(
+            usage_limit=None, is_active=False)
+        order = self.create_order('second')
+        self.assertIsNone(order['applied_coupon'])
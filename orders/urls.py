@@ -7,6 +7,7 @@ urlpatterns = [
     # Orders
     path('orders/', views.OrderListView.as_view(), name='order_list'),
     path('orders/create/', views.OrderCreateView.as_view(), name='create_order'),
+    path('orders/history/', views.OrderHistoryView.as_view(), name='order_history'),
     path('orders/<int:pk>/', views.OrderDetailView.as_view(), name='order_detail'),
     path('orders/<int:pk>/cancel/',
          views.OrderCancelView.as_view(), name='cancel_order'),
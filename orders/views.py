@@ -1,19 +1,35 @@
+from decimal import Decimal, InvalidOperation
 from rest_framework import status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django.shortcuts import get_object_or_404
 from django.db import transaction
+from django.db.models import Case, F, IntegerField, Sum, When
+from django.db.models.functions import Now
 from django.utils import timezone
-
-from .models import Order, OrderItem, OrderStatusHistory, ShippingMethod, TaxRate
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import cache_control
+from django.views.decorators.vary import vary_on_headers
+
+from cart.models import Cart, CartCoupon, get_coupon_by_code
+from products.models import Product
+from .models import (
+    Order, OrderItem, OrderStatusHistory, ORDER_STATUS_FIELDS,
+    ORDER_TRACKING_FIELDS, REFERENCE_CACHE_TIMEOUT, STATUS_TIMESTAMP_FIELDS,
+    find_tax_rate, get_active_shipping_method, get_active_shipping_methods,
+    get_active_tax_rates
+)
 from .serializers import (
     OrderListSerializer, OrderDetailSerializer, OrderCreateSerializer,
     OrderUpdateSerializer, OrderCancelSerializer, OrderStatusUpdateSerializer,
     OrderTrackingSerializer, OrderSummarySerializer, CheckoutSerializer,
-    ShippingMethodSerializer, TaxRateSerializer
+    ShippingMethodSerializer, TaxRateSerializer, OrderStatusHistorySerializer
 )
 
+# Flat tax rate for orders created without an address-based rate
+DEFAULT_TAX_RATE = Decimal('0.085')  # 8.5%
+
 
 class OrderListView(generics.ListAPIView):
     """Order list view."""
@@ -23,7 +39,9 @@ class OrderListView(generics.ListAPIView):
 
     def get_queryset(self):
         """Get user's orders."""
-        return Order.objects.filter(user=self.request.user).select_related('applied_coupon')
+        # Meta.ordering doesn't apply to the aggregated query, so order explicitly
+        return Order.objects.filter(user=self.request.user).for_listing().order_by(
+            '-created_at', '-id')
 
 
 class OrderDetailView(generics.RetrieveAPIView):
@@ -34,7 +52,7 @@ class OrderDetailView(generics.RetrieveAPIView):
 
     def get_queryset(self):
         """Get user's orders."""
-        return Order.objects.filter(user=self.request.user).select_related('applied_coupon')
+        return Order.objects.filter(user=self.request.user).with_details()
 
 
 class OrderCreateView(APIView):
@@ -48,17 +66,21 @@ class OrderCreateView(APIView):
         if serializer.is_valid():
             with transaction.atomic():
                 # Get user's cart
-                from cart.models import Cart
                 try:
                     cart = Cart.objects.get(user=request.user)
                 except Cart.DoesNotExist:
                     return Response({'error': 'Cart is empty.'}, status=status.HTTP_400_BAD_REQUEST)
 
-                if cart.items.count() == 0:
+                # Load the lines and their products once, for the empty check
+                # and the order item snapshot
+                cart_items = list(cart.items.select_related('product'))
+                if not cart_items:
                     return Response({'error': 'Cart is empty.'}, status=status.HTTP_400_BAD_REQUEST)
 
-                # Calculate order totals
-                subtotal = cart.total_price
+                # Calculate order totals from the loaded lines, at the same
+                # prices the order items snapshot
+                subtotal = sum((item.total_price for item in cart_items),
+                               Decimal('0'))
                 shipping_amount = 0  # Will be calculated based on shipping method
                 tax_amount = 0  # Will be calculated based on address
                 discount_amount = 0
@@ -67,19 +89,18 @@ class OrderCreateView(APIView):
                 applied_coupon = None
                 coupon_code = serializer.validated_data.get('coupon_code')
                 if coupon_code:
-                    from cart.models import CartCoupon, AppliedCoupon
-                    try:
-                        coupon = CartCoupon.objects.get(
-                            code=coupon_code.upper())
-                        if coupon.is_valid and cart.total_price >= coupon.minimum_purchase:
-                            discount_amount = coupon.calculate_discount(
-                                cart.total_price)
-                            applied_coupon = coupon
-                    except CartCoupon.DoesNotExist:
-                        pass
+                    coupon = get_coupon_by_code(coupon_code.upper())
+                    # Claim a use only while the coupon is still valid in the
+                    # database; the cached copy may lag behind it
+                    if (coupon is not None and
+                            subtotal >= coupon.minimum_purchase and
+                            CartCoupon.objects.valid().filter(pk=coupon.pk).update(
+                                used_count=F('used_count') + 1)):
+                        discount_amount = coupon.calculate_discount(subtotal)
+                        applied_coupon = coupon
 
                 # Calculate tax (simplified - in production, use proper tax calculation)
-                tax_rate = 0.085  # 8.5% default tax rate
+                tax_rate = DEFAULT_TAX_RATE
                 tax_amount = (subtotal - discount_amount) * tax_rate
 
                 # Calculate total
@@ -104,16 +125,7 @@ class OrderCreateView(APIView):
                 )
 
                 # Create order items
-                for cart_item in cart.items.all():
-                    OrderItem.objects.create(
-                        order=order,
-                        product=cart_item.product,
-                        product_name=cart_item.product.name,
-                        product_sku=cart_item.product.sku,
-                        quantity=cart_item.quantity,
-                        unit_price=cart_item.product.current_price,
-                        total_price=cart_item.total_price
-                    )
+                OrderItem.bulk_create_from_cart(order, cart_items)
 
                 # Create status history
                 OrderStatusHistory.objects.create(
@@ -125,6 +137,8 @@ class OrderCreateView(APIView):
                 # Clear cart
                 cart.clear()
 
+                # Reload with items, products and history for the response
+                order = Order.objects.with_details().get(pk=order.pk)
                 return Response({
                     'message': 'Order created successfully.',
                     'order': OrderDetailSerializer(order).data
@@ -141,7 +155,8 @@ class OrderCancelView(APIView):
     def post(self, request, order_id):
         """Cancel an order."""
         try:
-            order = Order.objects.get(id=order_id, user=request.user)
+            order = Order.objects.only(*ORDER_STATUS_FIELDS).get(
+                id=order_id, user=request.user)
         except Order.DoesNotExist:
             return Response({'error': 'Order not found.'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -159,11 +174,22 @@ class OrderCancelView(APIView):
                 notes=request.data.get('reason', 'Order cancelled by customer')
             )
 
-            # Restore inventory (if needed)
-            for order_item in order.items.all():
-                product = order_item.product
-                product.stock_quantity += order_item.quantity
-                product.save()
+            # Restore inventory in one UPDATE ... CASE over the ordered products
+            restock = order.items.values('product_id').annotate(
+                quantity=Sum('quantity')).order_by()
+            if restock:
+                Product.objects.filter(
+                    id__in=[line['product_id'] for line in restock]
+                ).update(
+                    stock_quantity=Case(
+                        *[When(id=line['product_id'],
+                               then=F('stock_quantity') + line['quantity'])
+                          for line in restock],
+                        output_field=IntegerField()
+                    ),
+                    # Bumped so cached product payloads are rebuilt
+                    updated_at=Now()
+                )
 
         return Response({'message': 'Order cancelled successfully.'}, status=status.HTTP_200_OK)
 
@@ -176,7 +202,7 @@ class OrderTrackingView(APIView):
     def get(self, request, order_number):
         """Get order tracking information."""
         try:
-            order = Order.objects.get(
+            order = Order.objects.only(*ORDER_TRACKING_FIELDS).get(
                 order_number=order_number, user=request.user)
         except Order.DoesNotExist:
             return Response({'error': 'Order not found.'}, status=status.HTTP_404_NOT_FOUND)
@@ -185,20 +211,40 @@ class OrderTrackingView(APIView):
         return Response(serializer.data)
 
 
+# Shared by every visitor and invalidated server-side on change, so clients
+# and proxies may reuse them for as long as the server-side cache does
+reference_data_cache = [
+    cache_control(public=True, max_age=REFERENCE_CACHE_TIMEOUT),
+    vary_on_headers('Accept'),
+]
+
+
+@method_decorator(reference_data_cache, name='dispatch')
 class ShippingMethodListView(generics.ListAPIView):
     """Shipping method list view."""
 
     permission_classes = [permissions.AllowAny]
     serializer_class = ShippingMethodSerializer
-    queryset = ShippingMethod.objects.filter(is_active=True)
+    # Served from a cached list, which the queryset filters can't operate on
+    filter_backends = []
 
+    def get_queryset(self):
+        """Get active shipping methods from the cache."""
+        return list(get_active_shipping_methods().values())
 
+
+@method_decorator(reference_data_cache, name='dispatch')
 class TaxRateListView(generics.ListAPIView):
     """Tax rate list view."""
 
     permission_classes = [permissions.AllowAny]
     serializer_class = TaxRateSerializer
-    queryset = TaxRate.objects.filter(is_active=True)
+    # Served from a cached list, which the queryset filters can't operate on
+    filter_backends = []
+
+    def get_queryset(self):
+        """Get active tax rates from the cache."""
+        return get_active_tax_rates()
 
 
 class CheckoutView(APIView):
@@ -225,7 +271,7 @@ class CheckoutView(APIView):
 def order_summary(request, order_id):
     """Get order summary."""
     try:
-        order = Order.objects.get(id=order_id, user=request.user)
+        order = Order.objects.for_listing().get(id=order_id, user=request.user)
     except Order.DoesNotExist:
         return Response({'error': 'Order not found.'}, status=status.HTTP_404_NOT_FOUND)
 
@@ -241,16 +287,22 @@ def update_order_status(request, order_id):
         return Response({'error': 'Permission denied.'}, status=status.HTTP_403_FORBIDDEN)
 
     try:
-        order = Order.objects.get(id=order_id)
+        order = Order.objects.only(*ORDER_STATUS_FIELDS).get(id=order_id)
     except Order.DoesNotExist:
         return Response({'error': 'Order not found.'}, status=status.HTTP_404_NOT_FOUND)
 
     serializer = OrderStatusUpdateSerializer(
         order, data=request.data, partial=True)
     if serializer.is_valid():
+        # Stamp shipped_at / delivered_at in the same UPDATE as the status
+        extra = {}
+        new_status = serializer.validated_data.get('status')
+        if new_status in STATUS_TIMESTAMP_FIELDS:
+            extra[STATUS_TIMESTAMP_FIELDS[new_status]] = timezone.now()
+
         with transaction.atomic():
             old_status = order.status
-            serializer.save()
+            serializer.save(**extra)
 
             # Create status history
             OrderStatusHistory.objects.create(
@@ -260,26 +312,21 @@ def update_order_status(request, order_id):
                     'admin_notes', f'Status changed from {old_status} to {order.status}')
             )
 
-            # Update timestamps for specific statuses
-            if order.status == 'shipped':
-                order.shipped_at = timezone.now()
-                order.save()
-            elif order.status == 'delivered':
-                order.delivered_at = timezone.now()
-                order.save()
-
         return Response({'message': 'Order status updated successfully.'}, status=status.HTTP_200_OK)
 
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-@api_view(['GET'])
-@permission_classes([permissions.IsAuthenticated])
-def order_history(request):
-    """Get user's order history."""
-    orders = Order.objects.filter(user=request.user).order_by('-created_at')
-    serializer = OrderListSerializer(orders, many=True)
-    return Response(serializer.data)
+class OrderHistoryView(generics.ListAPIView):
+    """User's order history, paginated."""
+
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = OrderListSerializer
+
+    def get_queryset(self):
+        """Get user's orders, newest first."""
+        return Order.objects.filter(user=self.request.user).for_listing().order_by(
+            '-created_at', '-id')
 
 
 @api_view(['GET'])
@@ -287,7 +334,7 @@ def order_history(request):
 def recent_orders(request):
     """Get user's recent orders."""
     orders = Order.objects.filter(
-        user=request.user).order_by('-created_at')[:5]
+        user=request.user).for_listing().order_by('-created_at')[:5]
     serializer = OrderListSerializer(orders, many=True)
     return Response(serializer.data)
 
@@ -299,10 +346,8 @@ def calculate_shipping(request):
     shipping_method_id = request.data.get('shipping_method_id')
     address = request.data.get('address', {})
 
-    try:
-        shipping_method = ShippingMethod.objects.get(
-            id=shipping_method_id, is_active=True)
-    except ShippingMethod.DoesNotExist:
+    shipping_method = get_active_shipping_method(shipping_method_id)
+    if shipping_method is None:
         return Response({'error': 'Invalid shipping method.'}, status=status.HTTP_400_BAD_REQUEST)
 
     # In a real application, you would calculate shipping based on address and weight
@@ -326,28 +371,15 @@ def calculate_tax(request):
     city = address.get('city', '')
     postal_code = address.get('postal_code', '')
 
+    # Exact match, else the country's default tax rate
+    tax_rate = find_tax_rate(country, state, city, postal_code)
+
+    tax_rate_value = tax_rate.rate if tax_rate else DEFAULT_TAX_RATE
+
     try:
-        tax_rate = TaxRate.objects.get(
-            country=country,
-            state=state,
-            city=city,
-            postal_code=postal_code,
-            is_active=True
-        )
-    except TaxRate.DoesNotExist:
-        # Use default tax rate
-        tax_rate = TaxRate.objects.filter(
-            country=country,
-            is_active=True
-        ).first()
-
-    if not tax_rate:
-        # Default to 8.5%
-        tax_rate_value = 0.085
-    else:
-        tax_rate_value = tax_rate.rate
-
-    subtotal = request.data.get('subtotal', 0)
+        subtotal = Decimal(str(request.data.get('subtotal', 0)))
+    except InvalidOperation:
+        return Response({'error': 'Invalid subtotal.'}, status=status.HTTP_400_BAD_REQUEST)
     tax_amount = subtotal * tax_rate_value
 
     return Response({
@@ -361,13 +393,10 @@ def calculate_tax(request):
 @permission_classes([permissions.IsAuthenticated])
 def order_status_history(request, order_id):
     """Get order status history."""
-    try:
-        order = Order.objects.get(id=order_id, user=request.user)
-    except Order.DoesNotExist:
+    if not Order.objects.filter(id=order_id, user=request.user).exists():
         return Response({'error': 'Order not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-    from .serializers import OrderStatusHistorySerializer
     history = OrderStatusHistory.objects.filter(
-        order=order).order_by('-created_at')
+        order_id=order_id).order_by('-created_at')
     serializer = OrderStatusHistorySerializer(history, many=True)
     return Response(serializer.data)
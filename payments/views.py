@@ -2,6 +2,7 @@ import stripe
 import logging
 from decimal import Decimal
 from django.conf import settings
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
@@ -19,7 +20,7 @@ from .serializers import (
 )
 from .services import payment_processor, whatsapp_service
 from orders.models import Order, OrderItem
-from cart.models import Cart
+from cart.models import Cart, TAX_MULTIPLIER
 from .services.exchange_rate_service import exchange_rate_service
 from .serializers import (
     ExchangeRateSerializer, ExchangeRateCurrentSerializer, ExchangeRateHistorySerializer,
@@ -182,97 +183,95 @@ class CheckoutView(APIView):
     def post(self, request):
         """Process checkout and create order for manual payment."""
         try:
-            # Get user's cart
-            cart, created = Cart.objects.get_or_create(user=request.user)
+            # Order, items and payment are written together or not at all
+            with transaction.atomic():
+                # Get user's cart, locked so a repeated submit waits for this
+                # checkout and then finds the cart empty
+                cart, created = Cart.objects.select_for_update().get_or_create(
+                    user=request.user)
+
+                # Load the lines and their products once, for the empty
+                # check, the subtotal and the order item snapshot
+                cart_items = list(cart.items.select_related('product'))
+                if not cart_items:
+                    return Response({
+                        'error': 'Cart is empty.'
+                    }, status=status.HTTP_400_BAD_REQUEST)
 
-            if not cart.items.exists():
-                return Response({
-                    'error': 'Cart is empty.'
-                }, status=status.HTTP_400_BAD_REQUEST)
+                # Extract checkout data
+                shipping_address = request.data.get('shipping_address', {})
+                billing_address = request.data.get('billing_address', {})
+                customer_notes = request.data.get('customer_notes', '')
+                shipping_method_id = request.data.get('shipping_method_id')
 
-            # Extract checkout data
-            shipping_address = request.data.get('shipping_address', {})
-            billing_address = request.data.get('billing_address', {})
-            customer_notes = request.data.get('customer_notes', '')
-            shipping_method_id = request.data.get('shipping_method_id')
+                # Validate required fields
+                if not shipping_address:
+                    return Response({
+                        'error': 'Shipping address is required.'
+                    }, status=status.HTTP_400_BAD_REQUEST)
 
-            # Validate required fields
-            if not shipping_address:
-                return Response({
-                    'error': 'Shipping address is required.'
-                }, status=status.HTTP_400_BAD_REQUEST)
+                # Calculate totals from the loaded lines, at the same prices
+                # the order items snapshot
+                subtotal = sum((item.total_price for item in cart_items),
+                               Decimal('0'))
+                tax_amount = subtotal * TAX_MULTIPLIER - subtotal
+                shipping_amount = Decimal('0.00')  # Default free shipping
+
+                # Get shipping method if provided
+                if shipping_method_id:
+                    from orders.models import get_active_shipping_method
+                    shipping_method = get_active_shipping_method(
+                        shipping_method_id)
+                    if shipping_method is None:
+                        return Response({
+                            'error': 'Invalid shipping method.'
+                        }, status=status.HTTP_400_BAD_REQUEST)
+                    shipping_amount = shipping_method.price
 
-            # Calculate totals
-            subtotal = cart.total_price
-            tax_amount = cart.total_price_with_tax - cart.total_price
-            shipping_amount = Decimal('0.00')  # Default free shipping
+                # Calculate discount from applied coupons
+                discount_amount = sum(
+                    coupon.discount_amount for coupon in cart.applied_coupons.all()
+                )
 
-            # Get shipping method if provided
-            if shipping_method_id:
-                from orders.models import ShippingMethod
-                try:
-                    shipping_method = ShippingMethod.objects.get(
-                        id=shipping_method_id, is_active=True
-                    )
-                    shipping_amount = shipping_method.price
-                except ShippingMethod.DoesNotExist:
-                    return Response({
-                        'error': 'Invalid shipping method.'
-                    }, status=status.HTTP_400_BAD_REQUEST)
+                # Calculate total
+                total_amount = subtotal + tax_amount + shipping_amount - discount_amount
 
-            # Calculate discount from applied coupons
-            discount_amount = sum(
-                coupon.discount_amount for coupon in cart.applied_coupons.all()
-            )
+                # Create order
+                order = Order.objects.create(
+                    user=request.user,
+                    subtotal=subtotal,
+                    tax_amount=tax_amount,
+                    shipping_amount=shipping_amount,
+                    discount_amount=discount_amount,
+                    total_amount=total_amount,
+                    shipping_address=shipping_address,
+                    billing_address=billing_address or shipping_address,
+                    customer_notes=customer_notes,
+                    status='pending',
+                    payment_status='pending'
+                )
 
-            # Calculate total
-            total_amount = subtotal + tax_amount + shipping_amount - discount_amount
-
-            # Create order
-            order = Order.objects.create(
-                user=request.user,
-                subtotal=subtotal,
-                tax_amount=tax_amount,
-                shipping_amount=shipping_amount,
-                discount_amount=discount_amount,
-                total_amount=total_amount,
-                shipping_address=shipping_address,
-                billing_address=billing_address or shipping_address,
-                customer_notes=customer_notes,
-                status='pending',
-                payment_status='pending'
-            )
+                # Create order items
+                OrderItem.bulk_create_from_cart(order, cart_items)
 
-            # Create order items
-            for cart_item in cart.items.all():
-                OrderItem.objects.create(
+                # Apply coupon if any
+                applied_coupons = cart.applied_coupons.all()
+                if applied_coupons.exists():
+                    order.applied_coupon = applied_coupons.first().coupon
+                    order.save()
+
+                # Create manual payment record (no Stripe integration)
+                payment = Payment.objects.create(
                     order=order,
-                    product=cart_item.product,
-                    product_name=cart_item.product.name,
-                    product_sku=cart_item.product.sku,
-                    quantity=cart_item.quantity,
-                    unit_price=cart_item.product.current_price,
-                    total_price=cart_item.total_price
+                    user=request.user,
+                    amount=total_amount,
+                    currency='USD',
+                    payment_method='manual',
+                    status='pending'
                 )
 
-            # Apply coupon if any
-            applied_coupons = cart.applied_coupons.all()
-            if applied_coupons.exists():
-                order.applied_coupon = applied_coupons.first().coupon
-                order.save()
-
-            # Create manual payment record (no Stripe integration)
-            payment = Payment.objects.create(
-                order=order,
-                user=request.user,
-                amount=total_amount,
-                currency='USD',
-                payment_method='manual',
-                status='pending'
-            )
-
-            # Clear cart after successful order creation
-            cart.clear()
+                # Clear cart after successful order creation
+                cart.clear()
 
             # Send WhatsApp notification for new order
             payment_processor.process_new_order(order)
@@ -90,6 +90,13 @@ class ProductListSerializer(serializers.ModelSerializer):
 
     def get_primary_image(self, obj):
         """Get the primary image for the product."""
+        prefetched = getattr(obj, '_prefetched_objects_cache', {})
+        if 'images' in prefetched:
+            images = list(prefetched['images'])
+            image = next((image for image in images if image.is_primary),
+                         images[0] if images else None)
+            return ProductImageSerializer(image).data if image else None
+
         primary_image = obj.images.filter(is_primary=True).first()
         if primary_image:
             return ProductImageSerializer(primary_image).data
@@ -161,6 +168,13 @@ class ProductSearchSerializer(serializers.ModelSerializer):
 
     def get_primary_image(self, obj):
         """Get the primary image for the product."""
+        prefetched = getattr(obj, '_prefetched_objects_cache', {})
+        if 'images' in prefetched:
+            images = list(prefetched['images'])
+            image = next((image for image in images if image.is_primary),
+                         images[0] if images else None)
+            return ProductImageSerializer(image).data if image else None
+
         primary_image = obj.images.filter(is_primary=True).first()
         if primary_image:
             return ProductImageSerializer(primary_image).data
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Category, Product, ProductImage
+
+
+@receiver(post_save, sender=ProductImage)
+@receiver(post_delete, sender=ProductImage)
+def product_image_changed(sender, instance, **kwargs):
+    """Bump the product's updated_at so payloads cached per version refresh."""
+    Product.objects.filter(pk=instance.product_id).update(
+        updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Category)
+def category_changed(sender, instance, created=False, **kwargs):
+    """Bump updated_at on the category's products, which embed the category."""
+    if created:
+        return
+    Product.objects.filter(category=instance).update(
+        updated_at=timezone.now())